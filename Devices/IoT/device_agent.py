@@ -0,0 +1,285 @@
+import argparse
+import json
+import math
+import socket
+import threading
+import time
+
+UDP_IP = "255.255.255.255"
+UDP_PORT = 9004
+TICK_HZ = 50.0
+# packets per second once no sensor has changed for IDLE_AFTER_S (0: always TICK_HZ)
+IDLE_HZ = 0.0
+IDLE_AFTER_S = 1.0
+# per-sensor change that counts as activity (the magnetic encoder jitters)
+IDLE_DEADBAND = {"mag": 0.5}
+
+AS5600_ADDR = 0x36
+
+
+# ================= SENSORS =================
+# Every sensor exposes read() -> (value, mono_ts) where mono_ts is the
+# time.monotonic() of the last change/sample. A sensor may also expose
+# after_pack(value), called once its reading is in a packet. Hardware modules
+# are imported lazily so the mock sensors run on any Linux box.
+
+class RotaryEncoderSensor:
+    key = "rot"
+
+    def __init__(self, a=17, b=18):
+        from gpiozero import RotaryEncoder
+
+        self.rotor = RotaryEncoder(a=a, b=b, max_steps=0)
+        self._lock = threading.Lock()
+        self._value = (0, time.monotonic())
+        self.rotor.when_rotated = self._on_rotate
+
+    def _on_rotate(self):
+        with self._lock:
+            self._value = (self.rotor.steps, time.monotonic())
+
+    def reset(self):
+        self.rotor.steps = 0
+        self._on_rotate()
+
+    def read(self):
+        with self._lock:
+            return self._value
+
+
+class ButtonSensor:
+    key = "btn"
+
+    def __init__(self, pin=22, on_press=None):
+        from gpiozero import Button
+
+        self.button = Button(pin)
+        self.on_press = on_press
+        self._lock = threading.Lock()
+        self._pressed = 0
+        self._ts = time.monotonic()
+        self.button.when_pressed = self._on_press
+
+    def _on_press(self):
+        # latch only; on_press runs after the tick that reports the press
+        with self._lock:
+            self._pressed = 1
+            self._ts = time.monotonic()
+
+    def read(self):
+        # a press is reported once, on the next tick
+        with self._lock:
+            value = (self._pressed, self._ts)
+            self._pressed = 0
+            return value
+
+    def after_pack(self, value):
+        if value and self.on_press is not None:
+            self.on_press()
+
+
+class AS5600Sensor:
+    key = "mag"
+
+    def __init__(self, bus_id=1, addr=AS5600_ADDR):
+        import smbus
+
+        self.bus = smbus.SMBus(bus_id)
+        self.addr = addr
+
+    def read(self):
+        """Read raw angle from AS5600 magnetic encoder and convert to degrees."""
+        high = self.bus.read_byte_data(self.addr, 0x0E)
+        low = self.bus.read_byte_data(self.addr, 0x0F)
+        raw = (high << 8) | low
+        return round(raw * 360.0 / 4096.0, 2), time.monotonic()
+
+
+class MockRotaryEncoderSensor:
+    key = "rot"
+
+    def __init__(self, steps_per_s=3.0, span=5):
+        self.steps_per_s = steps_per_s
+        self.span = span
+        self._t0 = time.monotonic()
+
+    def reset(self):
+        self._t0 = time.monotonic()
+
+    def read(self):
+        now = time.monotonic()
+        phase = (now - self._t0) * self.steps_per_s / (2 * self.span)
+        return round(self.span * math.sin(2 * math.pi * phase)), now
+
+
+class MockButtonSensor:
+    key = "btn"
+
+    def __init__(self, period_s=5.0, on_press=None):
+        self.period_s = period_s
+        self.on_press = on_press
+        self._next = time.monotonic() + period_s
+
+    def read(self):
+        now = time.monotonic()
+        if now < self._next:
+            return 0, now
+        self._next += self.period_s
+        return 1, now
+
+    def after_pack(self, value):
+        if value and self.on_press is not None:
+            self.on_press()
+
+
+class MockAS5600Sensor:
+    key = "mag"
+
+    def __init__(self, deg_per_s=45.0):
+        self.deg_per_s = deg_per_s
+        self._t0 = time.monotonic()
+
+    def read(self):
+        now = time.monotonic()
+        return round(((now - self._t0) * self.deg_per_s) % 360.0, 2), now
+
+
+# ================= AGENT =================
+
+class DeviceAgent:
+    """Polls every sensor on one schedule and sends one packet per tick.
+
+    When no sensor has changed for `idle_after_s`, packets drop to an
+    `idle_hz` heartbeat; the first tick that sees a change sends at once and
+    restores the full rate. Sensors are still polled every tick.
+    """
+
+    def __init__(self, sensors, ip=UDP_IP, port=UDP_PORT, tick_hz=TICK_HZ,
+                 idle_hz=IDLE_HZ, idle_after_s=IDLE_AFTER_S):
+        self.sensors = sensors
+        self.addr = (ip, port)
+        self.tick_dt = 1.0 / tick_hz
+        self.idle_dt = 1.0 / idle_hz if idle_hz else None
+        self.idle_after_s = idle_after_s
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        self.seq = 0
+        self.idle = False
+        self._ref_values = None
+        self._last_change = None
+        self._last_send = None
+
+    def close(self):
+        self.sock.close()
+
+    def build_packet(self):
+        readings = [(sensor.key, sensor.read()) for sensor in self.sensors]
+        now = time.monotonic()
+        fields = {}
+        for key, (value, ts) in readings:
+            # per-field timestamp as age (ms) relative to the packet ts
+            fields[key] = [value, round((now - ts) * 1000.0, 1)]
+
+        # every reading is packed: side effects (a press resetting the rotary) may run now
+        for sensor, (_, (value, _)) in zip(self.sensors, readings):
+            after_pack = getattr(sensor, "after_pack", None)
+            if after_pack is not None:
+                after_pack(value)
+        return {"type": "agent", "seq": self.seq, "ts": now, "f": fields}
+
+    def _changed(self, fields):
+        # against the values at the last change, so slow drift still adds up
+        if self._ref_values is None:
+            return True
+        for key, (value, _) in fields.items():
+            ref = self._ref_values.get(key)
+            if ref is None or abs(value - ref) > IDLE_DEADBAND.get(key, 0):
+                return True
+        return False
+
+    def tick(self):
+        """Poll and send; returns the packet, or None if skipped while idle."""
+        packet = self.build_packet()
+        now = packet["ts"]
+        if self._changed(packet["f"]):
+            self._ref_values = {key: value for key, (value, _) in packet["f"].items()}
+            self._last_change = now
+            self.idle = False
+        elif self.idle_dt is not None and now - self._last_change >= self.idle_after_s:
+            self.idle = True
+
+        if self.idle and now - self._last_send < self.idle_dt * 0.999:
+            return None
+
+        # seq counts sent packets only, so gaps still mean loss
+        self.seq += 1
+        self._last_send = now
+        self.sock.sendto(json.dumps(packet, separators=(",", ":")).encode(), self.addr)
+        return packet
+
+    def run(self, verbose=False):
+        next_tick = time.monotonic()
+        while True:
+            packet = self.tick()
+            if verbose and packet is not None:
+                print(packet)
+
+            # fixed schedule: drift-free, skip missed ticks instead of bursting
+            next_tick += self.tick_dt
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+
+def build_sensors(names, mock):
+    sensors = []
+    rotary = None
+    if "rot" in names:
+        rotary = MockRotaryEncoderSensor() if mock else RotaryEncoderSensor()
+
+    for name in names:
+        if name == "rot":
+            sensors.append(rotary)
+        elif name == "btn":
+            # a press resets the rotary counter once the packet carrying the
+            # count at the press (with btn=1) is built, as in rotary_udp.py
+            on_press = rotary.reset if rotary is not None else None
+            sensors.append(MockButtonSensor(on_press=on_press) if mock else ButtonSensor(on_press=on_press))
+        elif name == "mag":
+            sensors.append(MockAS5600Sensor() if mock else AS5600Sensor())
+        else:
+            raise ValueError(f"Unknown sensor: {name}. Options: rot, btn, mag")
+    return sensors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unified Raspberry Pi sensor agent (single UDP stream)")
+    parser.add_argument("--ip", default=UDP_IP, help="Destination IP (default broadcast)")
+    parser.add_argument("--port", type=int, default=UDP_PORT, help=f"Destination UDP port (default {UDP_PORT})")
+    parser.add_argument("--hz", type=float, default=TICK_HZ, help=f"Packets per second (default {TICK_HZ:.0f})")
+    parser.add_argument("--idle-hz", type=float, default=IDLE_HZ, help="Heartbeat rate while no sensor changes, e.g. 2 (default 0 = always --hz)")
+    parser.add_argument("--idle-after", type=float, default=IDLE_AFTER_S, help=f"Seconds without change before idling (default {IDLE_AFTER_S:.0f})")
+    parser.add_argument("--sensors", default="rot,btn,mag", help="Comma separated list of: rot, btn, mag")
+    parser.add_argument("--mock", action="store_true", help="Use simulated sensors (no GPIO/I2C needed)")
+    parser.add_argument("--verbose", action="store_true", help="Print every packet")
+    args = parser.parse_args()
+
+    sensors = build_sensors([s.strip() for s in args.sensors.split(",") if s.strip()], args.mock)
+    agent = DeviceAgent(sensors, ip=args.ip, port=args.port, tick_hz=args.hz,
+                        idle_hz=args.idle_hz, idle_after_s=args.idle_after)
+    print(f"Broadcasting {args.sensors} on UDP {args.ip}:{args.port} at {args.hz:.0f} Hz")
+
+    try:
+        agent.run(verbose=args.verbose)
+    except KeyboardInterrupt:
+        print("\nShutdown")
+    finally:
+        agent.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,38 +2,138 @@ from gpiozero import RotaryEncoder, Button
 from signal import pause
 import socket
 import json
+import threading
+import time
 
 UDP_IP = "255.255.255.255"
 UDP_PORT = 6001
 
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+# Upper bound on packets per second; faster spins are coalesced into the
+# latest step count instead of producing one datagram per GPIO edge.
+MAX_SEND_HZ = 50.0
+# A change arriving after this much quiet time is flushed without waiting
+# for the next send slot.
+IDLE_GAP_S = 0.1
 
-rotor = RotaryEncoder(a=17, b=18, max_steps=0)
-button = Button(22)
 
-button_state = 0
+class LatestState:
+    """Single-slot cell holding the most recent encoder state.
 
-def send_state():
-    data = {
-        "type": "input",
-        "rotate": rotor.steps,
-        "button": button_state
-    }
-    sock.sendto(json.dumps(data).encode(), (UDP_IP, UDP_PORT))
-    print(data)
+    GPIO callbacks only overwrite the slot; the sender thread takes it.
+    """
 
-def rotate():
-    send_state()
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._steps = 0
+        self._button = 0
+        self._changed_at = 0.0
+        self._dirty = False
+        self._urgent = False
 
-def press():
-    global button_state
-    button_state = 1
-    send_state()
-    button_state = 0
-    rotor.steps = 0
+    def put(self, steps, button=0):
+        now = time.monotonic()
+        with self._cond:
+            # first change after a quiet period skips the rate limit
+            idle = now - self._changed_at >= IDLE_GAP_S
+            self._steps = steps
+            # a press latches until it has been sent
+            self._button |= button
+            self._changed_at = now
+            self._urgent = self._urgent or bool(button) or idle
+            self._dirty = True
+            self._cond.notify()
 
-rotor.when_rotated = rotate
-button.when_pressed = press
+    def take(self, next_slot, timeout=0.5):
+        """Wait for a change, then for `next_slot` unless it is urgent.
 
-pause()
+        Returns (steps, button, changed_at) or None on timeout.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._dirty, timeout):
+                return None
+            while not self._urgent:
+                remaining = next_slot - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            state = (self._steps, self._button, self._changed_at)
+            self._button = 0
+            self._dirty = False
+            self._urgent = False
+            return state
+
+
+class CoalescingSender:
+    def __init__(self, cell, ip=UDP_IP, port=UDP_PORT, max_hz=MAX_SEND_HZ):
+        self.cell = cell
+        self.addr = (ip, port)
+        self.min_dt = 1.0 / max_hz
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        self.seq = 0
+        self._last_send = 0.0
+        self._running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self._running = False
+        self.thread.join()
+        self.sock.close()
+
+    def _run(self):
+        while self._running:
+            state = self.cell.take(self._last_send + self.min_dt)
+            if state is None:
+                continue
+
+            steps, button, changed_at = state
+            data = {
+                "type": "input",
+                "rotate": steps,
+                "button": button,
+                "seq": self.seq,
+                "mono_ts": changed_at,
+            }
+            self.sock.sendto(json.dumps(data).encode(), self.addr)
+            self._last_send = time.monotonic()
+            self.seq += 1
+            print(data)
+
+
+def main():
+    rotor = RotaryEncoder(a=17, b=18, max_steps=0)
+    button = Button(22)
+
+    cell = LatestState()
+    sender = CoalescingSender(cell)
+
+    # GPIO callbacks: only store the latest value, never touch the socket
+    def rotate():
+        cell.put(rotor.steps)
+
+    def press():
+        cell.put(rotor.steps, button=1)
+        rotor.steps = 0
+
+    rotor.when_rotated = rotate
+    button.when_pressed = press
+
+    sender.start()
+    print(f"Broadcasting rotary encoder data on UDP {UDP_IP}:{UDP_PORT} (max {MAX_SEND_HZ:.0f} Hz)")
+
+    try:
+        pause()
+    except KeyboardInterrupt:
+        print("\nShutdown")
+    finally:
+        sender.stop()
+
+
+if __name__ == "__main__":
+    main()
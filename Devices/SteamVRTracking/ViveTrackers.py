@@ -1,6 +1,34 @@
 import openvr
 import time
-import math
+import numpy as np
+
+from rotation import (
+    matrix_to_quaternion, matrix_to_euler_deg,
+    matrices_to_quaternions, matrices_to_euler_deg
+)
+
+# OpenVR events after which the connected device set / metadata may differ
+DEVICE_CHANGE_EVENTS = (
+    openvr.VREvent_TrackedDeviceActivated,
+    openvr.VREvent_TrackedDeviceDeactivated,
+    openvr.VREvent_TrackedDeviceUpdated,
+)
+
+
+class DeviceRecord:
+    """Per-device reading, allocated once per connect and updated in place."""
+
+    __slots__ = ("index", "device_class", "serial", "pose_valid", "position", "quaternion", "euler_deg")
+
+    def __init__(self, index, device_class, serial):
+        self.index = index
+        self.device_class = device_class
+        self.serial = serial
+        self.pose_valid = False
+        self.position = None
+        self.quaternion = None
+        self.euler_deg = None
+
 
 class ViveTrackers:
     def __init__(self):
@@ -15,6 +43,13 @@ class ViveTrackers:
             openvr.TrackedDeviceClass_DisplayRedirect: "DisplayRedirect",
         }
 
+        # --- Device metadata cache (rebuilt only on connect/disconnect) ---
+        self._event = openvr.VREvent_t()
+        self._records = None
+        self._tracker_indices = None
+        # pose matrices of all valid devices, converted in one batch per poll
+        self._pose_buf = np.empty((openvr.k_unMaxTrackedDeviceCount, 3, 4))
+
     def shutdown(self):
         openvr.shutdown()
 
@@ -26,6 +61,37 @@ class ViveTrackers:
             m[2][3]
         )
 
+    def _poll_device_events(self):
+        while self.vr.pollNextEvent(self._event):
+            if self._event.eventType in DEVICE_CHANGE_EVENTS:
+                self._records = None
+
+    def _device_records(self):
+        self._poll_device_events()
+        if self._records is not None:
+            return self._records
+
+        records = []
+        for i in range(openvr.k_unMaxTrackedDeviceCount):
+            if not self.vr.isTrackedDeviceConnected(i):
+                continue
+
+            cls = self.vr.getTrackedDeviceClass(i)
+            class_name = self.device_class_names.get(cls, str(cls))
+            try:
+                serial = self.vr.getStringTrackedDeviceProperty(i, openvr.Prop_SerialNumber_String)
+            except Exception:
+                serial = "UNKNOWN"
+            records.append(DeviceRecord(i, class_name, serial))
+
+        self._records = records
+        self._tracker_indices = [r.index for r in records if r.device_class == "Tracker"]
+        return records
+
+    def _get_tracker_indices(self):
+        self._device_records()
+        return self._tracker_indices
+
     def get_tracker_positions(self):
         poses = self.vr.getDeviceToAbsoluteTrackingPose(
             openvr.TrackingUniverseStanding,
@@ -34,13 +100,7 @@ class ViveTrackers:
         )
         tracker_positions = []
 
-        for i in range(openvr.k_unMaxTrackedDeviceCount):
-            if not self.vr.isTrackedDeviceConnected(i):
-                continue
-
-            if self.vr.getTrackedDeviceClass(i) != openvr.TrackedDeviceClass_GenericTracker:
-                continue
-
+        for i in self._get_tracker_indices():
             if poses[i].bPoseIsValid:
                 tracker_positions.append(self._get_pose_position(poses[i]))
             else:
@@ -64,13 +124,7 @@ class ViveTrackers:
         )
         tracker_rotations = []
 
-        for i in range(openvr.k_unMaxTrackedDeviceCount):
-            if not self.vr.isTrackedDeviceConnected(i):
-                continue
-
-            if self.vr.getTrackedDeviceClass(i) != openvr.TrackedDeviceClass_GenericTracker:
-                continue
-
+        for i in self._get_tracker_indices():
             if poses[i].bPoseIsValid:
                 R = self._rotation_matrix(poses[i])
                 euler = self._matrix_to_euler_deg(R)
@@ -100,48 +154,10 @@ class ViveTrackers:
         )
 
     def _matrix_to_quaternion(self, R):
-        r00, r01, r02 = R[0]
-        r10, r11, r12 = R[1]
-        r20, r21, r22 = R[2]
-
-        trace = r00 + r11 + r22
-        if trace > 0:
-            s = 0.5 / math.sqrt(trace + 1.0)
-            w = 0.25 / s
-            x = (r21 - r12) * s
-            y = (r02 - r20) * s
-            z = (r10 - r01) * s
-        else:
-            if r00 > r11 and r00 > r22:
-                s = 2.0 * math.sqrt(1.0 + r00 - r11 - r22)
-                w = (r21 - r12) / s
-                x = 0.25 * s
-                y = (r01 + r10) / s
-                z = (r02 + r20) / s
-            elif r11 > r22:
-                s = 2.0 * math.sqrt(1.0 + r11 - r00 - r22)
-                w = (r02 - r20) / s
-                x = (r01 + r10) / s
-                y = 0.25 * s
-                z = (r12 + r21) / s
-            else:
-                s = 2.0 * math.sqrt(1.0 + r22 - r00 - r11)
-                w = (r10 - r01) / s
-                x = (r02 + r20) / s
-                y = (r12 + r21) / s
-                z = 0.25 * s
-        return (w, x, y, z)
+        return matrix_to_quaternion(R)
 
     def _matrix_to_euler_deg(self, R):
-        r00, r01, r02 = R[0]
-        r10, r11, r12 = R[1]
-        r20, r21, r22 = R[2]
-
-        roll = math.atan2(r21, r22)
-        pitch = math.asin(max(-1.0, min(1.0, -r20)))
-        yaw = math.atan2(r10, r00)
-
-        return (math.degrees(roll), math.degrees(pitch), math.degrees(yaw))
+        return matrix_to_euler_deg(R)
 
     def get_all_devices(self):
         poses = self.vr.getDeviceToAbsoluteTrackingPose(
@@ -150,52 +166,40 @@ class ViveTrackers:
             openvr.k_unMaxTrackedDeviceCount
         )
 
-        devices = []
-        for i in range(openvr.k_unMaxTrackedDeviceCount):
-            if not self.vr.isTrackedDeviceConnected(i):
-                continue
-
-            cls = self.vr.getTrackedDeviceClass(i)
-            class_name = self.device_class_names.get(cls, str(cls))
-            try:
-                serial = self.vr.getStringTrackedDeviceProperty(i, openvr.Prop_SerialNumber_String)
-            except Exception:
-                serial = "UNKNOWN"
-
-            pose = poses[i]
-            pose_valid = bool(pose.bPoseIsValid)
-            pos = None
-            quat = None
-            euler = None
-            if pose_valid:
-                pos = self._get_pose_position(pose)
-                R = self._rotation_matrix(pose)
-                quat = self._matrix_to_quaternion(R)
-                euler = self._matrix_to_euler_deg(R)
-
-            devices.append({
-                "index": i,
-                "class": class_name,
-                "serial": serial,
-                "pose_valid": pose_valid,
-                "position": pos,
-                "quaternion": quat,
-                "euler_deg": euler
-            })
+        devices = self._device_records()
+        valid = []
+        for d in devices:
+            pose = poses[d.index]
+            d.pose_valid = bool(pose.bPoseIsValid)
+            if d.pose_valid:
+                self._pose_buf[len(valid)] = np.ctypeslib.as_array(pose.mDeviceToAbsoluteTracking.m)
+                valid.append(d)
+            else:
+                d.position = d.quaternion = d.euler_deg = None
+
+        if valid:
+            M = self._pose_buf[:len(valid)]
+            positions = M[:, :, 3].tolist()
+            quats = matrices_to_quaternions(M).tolist()
+            eulers = matrices_to_euler_deg(M).tolist()
+            for d, pos, quat, euler in zip(valid, positions, quats, eulers):
+                d.position = tuple(pos)
+                d.quaternion = tuple(quat)
+                d.euler_deg = tuple(euler)
 
         return devices
 
     def print_all_readings(self):
         devices = self.get_all_devices()
         for d in devices:
-            idx = d["index"]
-            cls = d["class"]
-            ser = d["serial"]
-            valid = d["pose_valid"]
+            idx = d.index
+            cls = d.device_class
+            ser = d.serial
+            valid = d.pose_valid
             if valid:
-                x, y, z = d["position"]
-                w, qx, qy, qz = d["quaternion"]
-                roll, pitch, yaw = d["euler_deg"]
+                x, y, z = d.position
+                w, qx, qy, qz = d.quaternion
+                roll, pitch, yaw = d.euler_deg
                 print(f"Device {idx} | {cls} | {ser} | valid: {valid} | pos: x={x:.3f},y={y:.3f},z={z:.3f} | quat: w={w:.4f},x={qx:.4f},y={qy:.4f},z={qz:.4f} | euler_deg: roll={roll:.2f},pitch={pitch:.2f},yaw={yaw:.2f}")
             else:
                 print(f"Device {idx} | {cls} | {ser} | valid: {valid}")
@@ -207,14 +211,14 @@ if __name__ == "__main__":
     try:
         while True:
             devices = vt.get_all_devices()
-            trackers = [d for d in devices if d["class"] == "Tracker"]
+            trackers = [d for d in devices if d.device_class == "Tracker"]
 
             if trackers:
                 for n, d in enumerate(trackers, start=1):
-                    i = d["index"]
-                    if d["pose_valid"]:
-                        x, y, z = d["position"]
-                        roll, pitch, yaw = d["euler_deg"]
+                    i = d.index
+                    if d.pose_valid:
+                        x, y, z = d.position
+                        roll, pitch, yaw = d.euler_deg
                         print(f"Tracker {n} (device {i}): x={x:.3f}, y={y:.3f}, z={z:.3f}")
                         print(f"Tracker {n} (device {i}) Euler (deg): roll={roll:.2f}, pitch={pitch:.2f}, yaw={yaw:.2f}")
                     else:
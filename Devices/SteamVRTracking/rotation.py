@@ -0,0 +1,172 @@
+import math
+import time
+
+import numpy as np
+
+
+# ================= SCALAR (one 3x3 tuple) =================
+
+def matrix_to_quaternion(R):
+    r00, r01, r02 = R[0]
+    r10, r11, r12 = R[1]
+    r20, r21, r22 = R[2]
+
+    trace = r00 + r11 + r22
+    if trace > 0:
+        s = 0.5 / math.sqrt(trace + 1.0)
+        w = 0.25 / s
+        x = (r21 - r12) * s
+        y = (r02 - r20) * s
+        z = (r10 - r01) * s
+    else:
+        if r00 > r11 and r00 > r22:
+            s = 2.0 * math.sqrt(1.0 + r00 - r11 - r22)
+            w = (r21 - r12) / s
+            x = 0.25 * s
+            y = (r01 + r10) / s
+            z = (r02 + r20) / s
+        elif r11 > r22:
+            s = 2.0 * math.sqrt(1.0 + r11 - r00 - r22)
+            w = (r02 - r20) / s
+            x = (r01 + r10) / s
+            y = 0.25 * s
+            z = (r12 + r21) / s
+        else:
+            s = 2.0 * math.sqrt(1.0 + r22 - r00 - r11)
+            w = (r10 - r01) / s
+            x = (r02 + r20) / s
+            y = (r12 + r21) / s
+            z = 0.25 * s
+    return (w, x, y, z)
+
+
+def matrix_to_euler_deg(R):
+    r00, r01, r02 = R[0]
+    r10, r11, r12 = R[1]
+    r20, r21, r22 = R[2]
+
+    roll = math.atan2(r21, r22)
+    pitch = math.asin(max(-1.0, min(1.0, -r20)))
+    yaw = math.atan2(r10, r00)
+
+    return (math.degrees(roll), math.degrees(pitch), math.degrees(yaw))
+
+
+# ================= BATCHED (N devices at once) =================
+
+# signs of (r00, r11, r22) in 4*w^2, 4*x^2, 4*y^2, 4*z^2 (each plus 1)
+_DIAG_SIGNS = np.array([
+    [1.0, 1.0, 1.0],
+    [1.0, -1.0, -1.0],
+    [-1.0, 1.0, -1.0],
+    [-1.0, -1.0, 1.0],
+])
+# row k of the symmetric 4x4 "4 * q_k * q" matrix as indices into
+# (dw, dx, dy, dz, r21-r12, r02-r20, r10-r01, r01+r10, r02+r20, r12+r21)
+_PIVOT_ROWS = np.array([
+    [0, 4, 5, 6],
+    [4, 1, 7, 8],
+    [5, 7, 2, 9],
+    [6, 8, 9, 3],
+])
+
+
+def matrices_to_quaternions(M):
+    """(N, 3, 3) or (N, 3, 4) pose matrices -> (N, 4) quaternions (w, x, y, z).
+
+    Shepperd's method: every row uses the largest of the four diagonal
+    combinations as pivot, picked with argmax instead of branches. Signs are
+    canonicalized to w >= 0 (q and -q are the same rotation).
+    """
+    M = np.asarray(M, dtype=float)
+    n = M.shape[0]
+    R = M[:, :, :3].reshape(n, 9)
+
+    terms = np.empty((n, 10))
+    terms[:, :4] = 1.0 + R[:, [0, 4, 8]] @ _DIAG_SIGNS.T
+    terms[:, 4:7] = R[:, [7, 2, 3]] - R[:, [5, 6, 1]]
+    terms[:, 7:] = R[:, [1, 2, 5]] + R[:, [3, 6, 7]]
+
+    rows = np.arange(n)
+    pivot = np.argmax(terms[:, :4], axis=1)
+    q = terms[rows[:, None], _PIVOT_ROWS[pivot]]
+    scale = 0.5 / np.sqrt(terms[rows, pivot])
+    # canonical sign: w >= 0
+    scale[q[:, 0] < 0.0] *= -1.0
+    q *= scale[:, None]
+    return q
+
+
+def matrices_to_euler_deg(M):
+    """(N, 3, 3) or (N, 3, 4) pose matrices -> (N, 3) roll, pitch, yaw in degrees."""
+    M = np.asarray(M, dtype=float)
+    euler = np.empty((M.shape[0], 3))
+    euler[:, 0] = np.arctan2(M[:, 2, 1], M[:, 2, 2])
+    euler[:, 1] = np.arcsin(np.clip(-M[:, 2, 0], -1.0, 1.0))
+    euler[:, 2] = np.arctan2(M[:, 1, 0], M[:, 0, 0])
+    return np.degrees(euler, out=euler)
+
+
+# ================= SELF-CHECK / BENCHMARK =================
+
+def _random_poses(n, rng):
+    q = rng.normal(size=(n, 4))
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    w, x, y, z = q.T
+    M = np.zeros((n, 3, 4))
+    M[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    M[:, 0, 1] = 2 * (x * y - w * z)
+    M[:, 0, 2] = 2 * (x * z + w * y)
+    M[:, 1, 0] = 2 * (x * y + w * z)
+    M[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    M[:, 1, 2] = 2 * (y * z - w * x)
+    M[:, 2, 0] = 2 * (x * z - w * y)
+    M[:, 2, 1] = 2 * (y * z + w * x)
+    M[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    M[:, :, 3] = rng.uniform(-2.0, 2.0, size=(n, 3))
+    return M
+
+
+def _check(n=10000, seed=0):
+    rng = np.random.default_rng(seed)
+    M = _random_poses(n, rng)
+    # include the awkward cases: identity and 180 degree turns about each axis
+    M[:4, :, :3] = [np.eye(3), np.diag([1.0, -1.0, -1.0]), np.diag([-1.0, 1.0, -1.0]), np.diag([-1.0, -1.0, 1.0])]
+
+    q = matrices_to_quaternions(M)
+    e = matrices_to_euler_deg(M)
+    q_err = e_err = 0.0
+    for i in range(n):
+        R = M[i, :, :3].tolist()
+        qs = np.array(matrix_to_quaternion(R))
+        # q and -q describe the same rotation
+        q_err = max(q_err, min(np.abs(q[i] - qs).max(), np.abs(q[i] + qs).max()))
+        e_err = max(e_err, np.abs(e[i] - np.array(matrix_to_euler_deg(R))).max())
+    print(f"check n={n}: max quaternion err={q_err:.2e}, max euler err={e_err:.2e} deg")
+    assert q_err < 1e-9 and e_err < 1e-9
+
+
+def _bench(n=64, repeat=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    M = _random_poses(n, rng)
+    mats = [M[i, :, :3].tolist() for i in range(n)]
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for R in mats:
+            matrix_to_quaternion(R)
+            matrix_to_euler_deg(R)
+    scalar = (time.perf_counter() - t0) / repeat
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        matrices_to_quaternions(M)
+        matrices_to_euler_deg(M)
+    batched = (time.perf_counter() - t0) / repeat
+
+    print(f"bench n={n}: scalar {scalar * 1e6:.1f} us/frame, batched {batched * 1e6:.1f} us/frame ({scalar / batched:.1f}x)")
+
+
+if __name__ == "__main__":
+    _check()
+    _bench()
@@ -4,12 +4,17 @@ import socket
 import threading
 import time
 
+import numpy as np
 import pygame
 
 
 UDP_IP = "127.0.0.1"
 UDP_PORT = 9003
 SOCKET_TIMEOUT_S = 0.1
+RECV_BUFFER_BYTES = 1 << 20
+RECV_BATCH_MAX = 1024
+# print circle/ref line packets from the receive thread (debugging only)
+VERBOSE = False
 
 WINDOW_W = 900
 WINDOW_H = 700
@@ -28,94 +33,175 @@ CIRCLE_SEGMENTS = 64
 positions = []
 latest_ts = 0.0
 circle_data = None
+circle_version = 0
 lock = threading.Lock()
 
 
+class RecvStats:
+    """Receive-side counters shown in the overlay.
+
+    All of them are counted here, after the kernel: datagrams the kernel
+    dropped on a full socket buffer are never seen and are not counted.
+    `invalid` is datagrams that did not decode to a known packet, `coalesced`
+    positions superseded within the same batch, and `batch` the size of the
+    last batch drained.
+    """
+
+    def __init__(self):
+        self.packets = 0
+        self.invalid = 0
+        self.coalesced = 0
+        self.batch = 0
+        self.rate = 0.0
+        self._window_start = time.perf_counter()
+        self._window_packets = 0
+
+    def add_batch(self, received, invalid, coalesced):
+        self.packets += received
+        self.invalid += invalid
+        self.coalesced += coalesced
+        self.batch = received
+        self._window_packets += received
+        now = time.perf_counter()
+        if now - self._window_start >= 1.0:
+            self.rate = self._window_packets / (now - self._window_start)
+            self._window_start = now
+            self._window_packets = 0
+
+    def label(self):
+        return (
+            f"rx={self.rate:.0f}/s last_batch={self.batch} "
+            f"invalid={self.invalid} coalesced={self.coalesced}"
+        )
+
+
+recv_stats = RecvStats()
+
+
+def _vec3(v):
+    return (float(v[0]), float(v[1]), float(v[2]))
+
+
+def drain_socket(sock, first):
+    """Return `first` plus every datagram already queued on `sock`."""
+    batch = [first]
+    sock.setblocking(False)
+    try:
+        while len(batch) < RECV_BATCH_MAX:
+            batch.append(sock.recv(4096))
+    except (BlockingIOError, InterruptedError):
+        pass
+    finally:
+        sock.settimeout(SOCKET_TIMEOUT_S)
+    return batch
+
+
+def decode_batch(batch):
+    """Decode one batch of datagrams.
+
+    Only the newest MAX_POINTS positions can be displayed, so older ones
+    in the batch are counted as coalesced without being decoded.
+    """
+    pts = []
+    circle = None
+    latest = None
+    invalid = 0
+    coalesced = 0
+
+    pos_budget = MAX_POINTS
+    for data in reversed(batch):
+        is_circle = b'"circle"' in data
+        if not is_circle and pos_budget == 0:
+            coalesced += 1
+            continue
+        try:
+            msg = json.loads(data.decode("utf-8"))
+            if not isinstance(msg, dict):
+                invalid += 1
+                continue
+            ts = float(msg.get("ts", time.time()))
+            if msg.get("type", "pos") == "circle":
+                if circle is None:
+                    circle = (_vec3(msg["center"]), _vec3(msg["normal"]), float(msg["radius"]))
+                    if VERBOSE:
+                        print(f"recv circle: r={circle[2]:.6f} age={time.time() - ts:.2f}s")
+                continue
+            pts.append(_vec3((msg["x"], msg["y"], msg["z"])))
+            pos_budget -= 1
+            if latest is None:
+                latest = ts
+        except (ValueError, KeyError, TypeError, IndexError, UnicodeDecodeError):
+            invalid += 1
+
+    pts.reverse()
+    return pts, circle, latest, invalid, coalesced
+
+
 def recv_loop():
-    global circle_data
+    global circle_data, circle_version, latest_ts
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_BYTES)
+    except OSError:
+        pass
     sock.bind((UDP_IP, UDP_PORT))
     sock.settimeout(SOCKET_TIMEOUT_S)
     while True:
         try:
-            data, _addr = sock.recvfrom(4096)
+            data = sock.recv(4096)
         except socket.timeout:
             continue
-        try:
-            msg = json.loads(data.decode("utf-8"))
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            continue
-        msg_type = msg.get("type", "pos")
-        ts = float(msg.get("ts", time.time()))
-        age = time.time() - ts
-        if msg_type == "circle":
-            if not all(k in msg for k in ("center", "normal", "radius")):
-                continue
-            center = msg["center"]
-            normal = msg["normal"]
-            radius = msg["radius"]
-            if len(center) < 3 or len(normal) < 3:
-                continue
-            with lock:
-                circle_data = (
-                    (float(center[0]), float(center[1]), float(center[2])),
-                    (float(normal[0]), float(normal[1]), float(normal[2])),
-                    float(radius),
-                )
-            print(
-                f"recv circle: r={float(radius):.6f} age={age:.2f}s"
-            )
-            continue
+        batch = drain_socket(sock, data)
+        pts, circle, latest, invalid, coalesced = decode_batch(batch)
 
-        if not all(k in msg for k in ("x", "y", "z")):
-            continue
-        pos = (float(msg["x"]), float(msg["y"]), float(msg["z"]))
+        # one lock acquisition per batch
         with lock:
-            positions.append(pos)
-            if len(positions) > MAX_POINTS:
-                del positions[: len(positions) - MAX_POINTS]
-            latest_ts = ts
-        print(
-            f"recv pos: x={pos[0]:.6f} y={pos[1]:.6f} "
-            f"z={pos[2]:.6f} age={age:.2f}s"
-        )
-
-
-def rotate_point(x, y, z, yaw, pitch):
-    # Yaw around Y axis, pitch around X axis.
+            if pts:
+                positions.extend(pts)
+                if len(positions) > MAX_POINTS:
+                    del positions[: len(positions) - MAX_POINTS]
+                latest_ts = latest
+            if circle is not None:
+                circle_data = circle
+                circle_version += 1
+            recv_stats.add_batch(len(batch), invalid, coalesced)
+
+
+def view_matrix(yaw, pitch):
+    # Yaw around Y axis, pitch around X axis: rotated = points @ view.T
     cos_y = math.cos(yaw)
     sin_y = math.sin(yaw)
     cos_p = math.cos(pitch)
     sin_p = math.sin(pitch)
+    return np.array([
+        [cos_y, 0.0, sin_y],
+        [sin_y * sin_p, cos_p, -cos_y * sin_p],
+        [-sin_y * cos_p, sin_p, cos_y * cos_p],
+    ])
 
-    xz = x * cos_y + z * sin_y
-    zz = -x * sin_y + z * cos_y
 
-    yz = y * cos_p - zz * sin_p
-    zz2 = y * sin_p + zz * cos_p
-    return xz, yz, zz2
+def project_points(points, view, cx, cy):
+    """Rotate and project (N, 3) world points in one matrix multiply.
 
+    Returns integer screen coordinates (N, 2) and depth (N,).
+    """
+    rotated = points @ view.T
+    depth = FOV / (FOV + np.maximum(rotated[:, 2], Z_CLIP))
+    screen = np.empty((len(points), 2), dtype=np.int64)
+    screen[:, 0] = cx + rotated[:, 0] * WORLD_SCALE * depth
+    screen[:, 1] = cy - rotated[:, 1] * WORLD_SCALE * depth
+    return screen, depth
 
-def project_point(x, y, z, cx, cy):
-    z = max(z, Z_CLIP)
-    depth = FOV / (FOV + z)
-    sx = cx + x * WORLD_SCALE * depth
-    sy = cy - y * WORLD_SCALE * depth
-    return int(sx), int(sy), depth
 
+AXES_WORLD = np.array([
+    [1.5, 0.0, 0.0],
+    [0.0, 1.5, 0.0],
+    [0.0, 0.0, 1.5],
+])
 
-def draw_axes(screen, cx, cy, yaw, pitch):
-    axis_len = 1.5
-    for axis in ("x", "y", "z"):
-        if axis == "x":
-            x, y, z = axis_len, 0.0, 0.0
-        elif axis == "y":
-            x, y, z = 0.0, axis_len, 0.0
-        else:
-            x, y, z = 0.0, 0.0, axis_len
-        rx, ry, rz = rotate_point(x, y, z, yaw, pitch)
-        sx, sy, _ = project_point(rx, ry, rz, cx, cy)
-        pygame.draw.line(screen, AXIS_COLOR, (cx, cy), (sx, sy), 2)
+_CIRCLE_T = np.linspace(0.0, 2.0 * math.pi, CIRCLE_SEGMENTS + 1)
+_CIRCLE_COS = np.cos(_CIRCLE_T)
+_CIRCLE_SIN = np.sin(_CIRCLE_T)
 
 
 def _normalize(vec):
@@ -133,23 +219,67 @@ def _cross(a, b):
     )
 
 
-def draw_circle(screen, center, normal, radius, yaw, pitch, cx, cy):
+def circle_polyline(center, normal, radius):
+    """World-space polyline (CIRCLE_SEGMENTS + 1, 3) of a 3D circle."""
     n = _normalize(normal)
     # Pick a reference vector not parallel to n.
     ref = (0.0, 1.0, 0.0) if abs(n[1]) < 0.9 else (1.0, 0.0, 0.0)
-    u = _normalize(_cross(n, ref))
-    v = _cross(n, u)
-    points = []
-    for i in range(CIRCLE_SEGMENTS + 1):
-        angle = 2.0 * math.pi * i / CIRCLE_SEGMENTS
-        x = center[0] + radius * (u[0] * math.cos(angle) + v[0] * math.sin(angle))
-        y = center[1] + radius * (u[1] * math.cos(angle) + v[1] * math.sin(angle))
-        z = center[2] + radius * (u[2] * math.cos(angle) + v[2] * math.sin(angle))
-        rx, ry, rz = rotate_point(x, y, z, yaw, pitch)
-        sx, sy, _ = project_point(rx, ry, rz, cx, cy)
-        points.append((sx, sy))
-    if len(points) > 1:
-        pygame.draw.lines(screen, (255, 160, 80), False, points, 2)
+    u = np.asarray(_normalize(_cross(n, ref)))
+    v = np.asarray(_cross(n, u))
+    return (
+        np.asarray(center)
+        + radius * (_CIRCLE_COS[:, None] * u + _CIRCLE_SIN[:, None] * v)
+    )
+
+
+class SceneCache:
+    """Keeps the static geometry projected until the view or circles change."""
+
+    def __init__(self):
+        self._circles_version = None
+        self._circles_world = np.empty((0, 3))
+        self._view_key = None
+        self._circle_lines = []
+        self._axes = []
+
+    def update(self, circles, version, yaw, pitch, cx, cy):
+        if version != self._circles_version:
+            # one stacked array holding every circle's polyline
+            polylines = [circle_polyline(*circle) for circle in circles]
+            self._circles_world = (
+                np.concatenate(polylines) if polylines else np.empty((0, 3))
+            )
+            self._circles_version = version
+            self._view_key = None
+
+        view_key = (yaw, pitch, cx, cy)
+        if view_key == self._view_key:
+            return
+        self._view_key = view_key
+
+        view = view_matrix(yaw, pitch)
+        world = np.concatenate([AXES_WORLD, self._circles_world])
+        screen, _ = project_points(world, view, cx, cy)
+        self._axes = [tuple(p) for p in screen[:3].tolist()]
+        stride = CIRCLE_SEGMENTS + 1
+        lines = screen[3:].tolist()
+        self._circle_lines = [
+            lines[i:i + stride] for i in range(0, len(lines), stride)
+        ]
+
+    def draw(self, screen, cx, cy):
+        for end in self._axes:
+            pygame.draw.line(screen, AXIS_COLOR, (cx, cy), end, 2)
+        for points in self._circle_lines:
+            pygame.draw.lines(screen, (255, 160, 80), False, points, 2)
+
+
+def draw_points(screen, pts, view, cx, cy):
+    pts = np.asarray(pts, dtype=float)
+    proj, depth = project_points(pts, view, cx, cy)
+    sizes = np.maximum(2, (3 * depth).astype(int))
+    for (sx, sy), size in zip(proj.tolist(), sizes.tolist()):
+        pygame.draw.circle(screen, POINT_COLOR, (sx, sy), size)
 
 
 def main():
@@ -167,6 +297,8 @@ def main():
     dragging = False
     last_mouse = (0, 0)
 
+    scene = SceneCache()
+
     running = True
     while running:
         for event in pygame.event.get():
@@ -187,25 +319,24 @@ def main():
 
         screen.fill(BG_COLOR)
         cx, cy = WINDOW_W // 2, WINDOW_H // 2
-        draw_axes(screen, cx, cy, yaw, pitch)
 
         with lock:
             pts = list(positions)
             age = time.time() - latest_ts if latest_ts else 0.0
             circle = circle_data
+            circles_version = circle_version
+            stats_label = recv_stats.label()
 
-        for x, y, z in pts:
-            rx, ry, rz = rotate_point(x, y, z, yaw, pitch)
-            sx, sy, depth = project_point(rx, ry, rz, cx, cy)
-            size = max(2, int(3 * depth))
-            pygame.draw.circle(screen, POINT_COLOR, (sx, sy), size)
+        circles = [circle] if circle is not None else []
+        scene.update(circles, circles_version, yaw, pitch, cx, cy)
+        scene.draw(screen, cx, cy)
 
-        if circle is not None:
-            center, normal, radius = circle
-            draw_circle(screen, center, normal, radius, yaw, pitch, cx, cy)
+        if pts:
+            draw_points(screen, pts, view_matrix(yaw, pitch), cx, cy)
 
         label = f"points={len(pts)} age={age:.2f}s"
         screen.blit(font.render(label, True, TEXT_COLOR), (12, 12))
+        screen.blit(font.render(stats_label, True, TEXT_COLOR), (12, 32))
 
         pygame.display.flip()
         clock.tick(60)
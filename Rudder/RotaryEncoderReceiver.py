@@ -11,13 +11,83 @@ except Exception:
 
 DEGREES_PER_STATE = 24
 
+# --- Interpolation ---
+# Fraction of a step the prediction may lead the last received step.
+# Kept below 1.0 so the output never overshoots the next step.
+MAX_LEAD_STEPS = 0.75
+# Smoothing factor for the step velocity estimate.
+VELOCITY_ALPHA = 0.5
+# Gaps longer than this mean the knob was at rest; velocity restarts from 0.
+IDLE_RESET_S = 0.5
+# Once no step arrived for this many expected step intervals, the lead
+# eases back to the last received step over LEAD_DECAY_S.
+STALE_INTERVALS = 1.5
+LEAD_DECAY_S = 0.15
+# A count falling by more than this between packets is a reset on the
+# sender (button press zeroes it), not motion.
+MAX_STEP_DROP = 2
+
+
+class StepInterpolator:
+    """Predicts a continuous step position from timestamped step events.
+
+    The state is published as one immutable tuple so `steps_at()` is
+    O(1) and never blocks on the socket thread.
+    """
+
+    def __init__(self):
+        # (steps, event_time, steps_per_s)
+        self._snapshot = (0, time.monotonic(), 0.0)
+
+    def reset(self, steps=0, t=None):
+        self._snapshot = (steps, time.monotonic() if t is None else t, 0.0)
+
+    def on_steps(self, steps, t):
+        prev_steps, prev_t, velocity = self._snapshot
+        dt = t - prev_t
+        if dt <= 0:
+            self._snapshot = (steps, prev_t, velocity)
+            return
+
+        if prev_steps - steps > MAX_STEP_DROP:
+            self.reset(steps, t)
+            return
+
+        rate = (steps - prev_steps) / dt
+        if dt > IDLE_RESET_S:
+            # starting from rest: the long gap says nothing about speed
+            velocity = 0.0
+        elif steps == prev_steps:
+            velocity = 0.0
+        else:
+            velocity = VELOCITY_ALPHA * rate + (1.0 - VELOCITY_ALPHA) * velocity
+        self._snapshot = (steps, t, velocity)
+
+    def steps_at(self, t):
+        steps, t0, velocity = self._snapshot
+        elapsed = t - t0
+        if velocity == 0.0 or elapsed <= 0:
+            return float(steps)
+
+        lead = max(-MAX_LEAD_STEPS, min(MAX_LEAD_STEPS, velocity * elapsed))
+        stale_after = STALE_INTERVALS / abs(velocity)
+        if elapsed > stale_after:
+            lead *= max(0.0, 1.0 - (elapsed - stale_after) / LEAD_DECAY_S)
+        return steps + lead
+
 
 class RotaryEncoderReceiver:
-    def __init__(self, port=6001):
+    def __init__(self, port=6001, interpolate=True):
         self.state = {
             "rotate": 0.0,
             "button": 0
         }
+        self.interpolate = interpolate
+        self.interpolator = StepInterpolator()
+        # sender monotonic clock -> local monotonic clock
+        self._clock_offset = None
+        self._last_seq = None
+        self._after_press = False
 
         # protect access to `state`
         self._lock = threading.Lock()
@@ -40,13 +110,44 @@ class RotaryEncoderReceiver:
 
             if msg.get("type") == "input":
                 raw_state = msg["rotate"]
+                button = msg.get("button", 0)
+                t = self._event_time(msg)
 
-                # Convert state (1..9) -> degrees
                 with self._lock:
+                    if button == 1 or self._after_press:
+                        # the press zeroes the sender's count: a jump, not motion
+                        self.interpolator.reset(raw_state, t)
+                    else:
+                        self.interpolator.on_steps(raw_state, t)
+                    self._after_press = button == 1
+
+                    # Convert state (1..9) -> degrees
                     self.state["rotate"] = raw_state * DEGREES_PER_STATE
-                    self.state["button"] = msg.get("button", 0)
+                    self.state["button"] = button
                     # print("Rudder state:", self.state)
 
+    def _event_time(self, msg):
+        """Local monotonic time of the step event.
+
+        Uses the sender's `mono_ts` when present (removes network jitter);
+        the clock offset is the smallest observed arrival - send difference.
+        """
+        arrival = time.monotonic()
+        sent = msg.get("mono_ts")
+        if sent is None:
+            return arrival
+
+        seq = msg.get("seq")
+        if seq is not None and self._last_seq is not None and seq < self._last_seq:
+            # sender restarted, its clock origin may have changed
+            self._clock_offset = None
+        self._last_seq = seq
+
+        offset = arrival - sent
+        if self._clock_offset is None or offset < self._clock_offset:
+            self._clock_offset = offset
+        return sent + self._clock_offset
+
     def _keyboard_listener(self):
         # simple Windows console keylistener: q -> left, e -> right
         while True:
@@ -61,17 +162,25 @@ class RotaryEncoderReceiver:
                     with self._lock:
                         self.state['rotate'] -= DEGREES_PER_STATE
                         print(f"Rudder rotate -> {self.state['rotate']}")
+                        # keyboard jumps are not motion, don't predict from them
+                        self.interpolator.reset(self.state['rotate'] / DEGREES_PER_STATE)
                 elif key.lower() == 'e':
                     with self._lock:
                         self.state['rotate'] += DEGREES_PER_STATE
                         print(f"Rudder rotate -> {self.state['rotate']}")
+                        self.interpolator.reset(self.state['rotate'] / DEGREES_PER_STATE)
             else:
                 # avoid busy loop
                 time.sleep(0.05)
 
-    def get(self):
+    def get(self, t=None):
+        """Current state; `rotate` is interpolated at `t` (default: now)."""
         with self._lock:
-            return self.state.copy()
+            state = self.state.copy()
+        if self.interpolate:
+            now = time.monotonic() if t is None else t
+            state["rotate"] = self.interpolator.steps_at(now) * DEGREES_PER_STATE
+        return state
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import argparse
+import threading
 import time
 import numpy as np
 import matplotlib.pyplot as plt
@@ -7,6 +8,10 @@ from mpl_toolkits.mplot3d import proj3d
 import socket
 import json
 
+# world (x, y, z) -> plot (x, z, y): Y is drawn as the vertical axis
+PLOT_AXES = [0, 2, 1]
+
+
 def to_plot(p):
     return p[0], p[2], p[1]
 
@@ -21,10 +26,11 @@ def label_at_point(ax, text_obj, p, dx=6, dy=6):
     text_obj.set_position((x_final, y_final))
 
 class Cycle3DSimulator:
-    def __init__(self, udp_ip: str = "127.0.0.1", udp_port: int = 9000):
+    def __init__(self, udp_ip: str = "127.0.0.1", udp_port: int = 9000, send_hz: float = 60.0):
         self.UDP_IP = udp_ip
         self.UDP_PORT = udp_port
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.send_dt = 1.0 / send_hz
 
         self.fig = plt.figure()
         self.ax = self.fig.add_subplot(111, projection='3d')
@@ -44,7 +50,9 @@ class Cycle3DSimulator:
 
         self.rotation_y = 0.0
         self.circle_angle = 0.0
-        self.last_time = time.time()
+        # sim state is advanced by the sender thread and read by the renderer
+        self._lock = threading.Lock()
+        self._running = True
 
         self.cycle_speed = 0.1  # radians per frame step (can go negative for reverse)
         self.cycle_speed_step = 0.02  # additive step for up/down keys
@@ -59,6 +67,8 @@ class Cycle3DSimulator:
             np.sin(self.theta),
             np.zeros_like(self.theta)
         ], axis=1)
+        # circles only change with rotation_y
+        self._drawn_rotation_y = None
 
         self.O_dot,  = self.ax.plot([], [], [], 'ko', markersize=5)
         self.O1_dot, = self.ax.plot([], [], [], 'ro', markersize=6)
@@ -82,7 +92,11 @@ class Cycle3DSimulator:
         )
 
         self.fig.canvas.mpl_connect('key_press_event', self.on_key)
-        self.ani = FuncAnimation(self.fig, self.update, interval=30)
+        self.fig.canvas.mpl_connect('close_event', lambda _event: self.stop())
+        # no blitting: a 3D view rotated with the mouse must redraw its background
+        self.ani = FuncAnimation(self.fig, self.update, interval=30, blit=False, cache_frame_data=False)
+
+        self.send_thread = threading.Thread(target=self._send_loop, daemon=True)
 
     def rot_y(self, theta):
         c = np.cos(theta)
@@ -102,76 +116,84 @@ class Cycle3DSimulator:
         }
         self.sock.sendto(json.dumps(payload).encode("utf-8"), (self.UDP_IP, self.UDP_PORT))
 
+    def angular_velocity_deg_s(self):
+        return np.degrees(self.cycle_speed) / self.frame_interval_s
+
+    def _send_loop(self):
+        """Advance the crank and send at a fixed rate, independent of rendering."""
+        next_send = time.perf_counter()
+        last = next_send
+        while self._running:
+            now = time.perf_counter()
+            with self._lock:
+                # cycle_speed is radians per nominal frame interval
+                self.circle_angle += self.cycle_speed / self.frame_interval_s * (now - last)
+                phase1_deg = np.degrees(self.circle_angle % (2 * np.pi))
+                rudder_deg = np.degrees(self.rotation_y)
+                angular_velocity_deg_s = self.angular_velocity_deg_s()
+            last = now
+
+            self.send_udp_angle(
+                angle_deg=phase1_deg,
+                angular_velocity_deg_s=angular_velocity_deg_s,
+                rudder_deg=rudder_deg,
+            )
+
+            next_send += self.send_dt
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_send = time.perf_counter()
+
+    def stop(self):
+        self._running = False
+
     def update(self, frame):
-        now = time.time()
-        dt = max(now - self.last_time, 1e-6)
+        with self._lock:
+            rotation_y = self.rotation_y
+            circle_angle = self.circle_angle
+            angular_velocity_deg_s = self.angular_velocity_deg_s()
 
-        R = self.rot_y(self.rotation_y)
+        R = self.rot_y(rotation_y)
 
         O = np.array([0.0, 0.0, 0.0])
         O1 = R @ self.base_O1
         O2 = R @ self.base_O2
 
-        self.circle_angle += self.cycle_speed
-
-        phase1 = self.circle_angle % (2*np.pi)
-        phase2 = (self.circle_angle + np.pi) % (2*np.pi)
+        phase1 = circle_angle % (2*np.pi)
+        phase2 = (circle_angle + np.pi) % (2*np.pi)
 
-        a1_local = self.RADIUS * np.array([
-            np.cos(self.circle_angle),
-            np.sin(self.circle_angle),
-            0.0
+        # A1 and A2 sit on opposite sides of their circles
+        a_local = self.RADIUS * np.array([
+            [np.cos(circle_angle), np.sin(circle_angle), 0.0],
+            [np.cos(circle_angle + np.pi), np.sin(circle_angle + np.pi), 0.0],
         ])
+        A1, A2 = np.array([O1, O2]) + a_local @ R.T
 
-        a2_local = self.RADIUS * np.array([
-            np.cos(self.circle_angle + np.pi),
-            np.sin(self.circle_angle + np.pi),
-            0.0
-        ])
-
-        A1 = O1 + R @ a1_local
-        A2 = O2 + R @ a2_local
-
-        # Compute rudder angle and cycle angular velocity in degrees
-        rudder_deg = np.degrees(self.rotation_y)
-        phase1_deg = np.degrees(phase1)
-        cycle_speed_deg_step = np.degrees(self.cycle_speed)
-        angular_velocity_deg_s = cycle_speed_deg_step / self.frame_interval_s
-        self.last_time = now
-
-        # Send combined payload to localhost
-        self.send_udp_angle(
-            angle_deg=phase1_deg,
-            angular_velocity_deg_s=angular_velocity_deg_s,
-            rudder_deg=rudder_deg,
-        )
+        rudder_deg = np.degrees(rotation_y)
 
-        circle1 = O1 + (self.unit_circle @ R.T) * self.RADIUS
-        circle2 = O2 + (self.unit_circle @ R.T) * self.RADIUS
-
-        for dot, p in [
-            (self.O_dot,  O),
-            (self.O1_dot, O1),
-            (self.O2_dot, O2),
-            (self.A1_dot, A1),
-            (self.A2_dot, A2),
-        ]:
-            x, y, z = to_plot(p)
+        # dots: one swizzle for all five points
+        points = np.array([O, O1, O2, A1, A2])[:, PLOT_AXES]
+        for dot, (x, y, z) in zip(
+            (self.O_dot, self.O1_dot, self.O2_dot, self.A1_dot, self.A2_dot),
+            points,
+        ):
             dot.set_data([x], [y])
             dot.set_3d_properties([z])
 
-        x1, y1, z1 = to_plot(O1)
-        x2, y2, z2 = to_plot(O2)
-        self.link_line.set_data([x1, x2], [y1, y2])
-        self.link_line.set_3d_properties([z1, z2])
+        if rotation_y != self._drawn_rotation_y:
+            self._drawn_rotation_y = rotation_y
 
-        cx, cy, cz = zip(*[to_plot(p) for p in circle1])
-        self.circle1_line.set_data(cx, cy)
-        self.circle1_line.set_3d_properties(cz)
+            link = points[1:3]
+            self.link_line.set_data(link[:, 0], link[:, 1])
+            self.link_line.set_3d_properties(link[:, 2])
 
-        cx, cy, cz = zip(*[to_plot(p) for p in circle2])
-        self.circle2_line.set_data(cx, cy)
-        self.circle2_line.set_3d_properties(cz)
+            ring = (self.unit_circle @ R.T) * self.RADIUS
+            for line, center in ((self.circle1_line, O1), (self.circle2_line, O2)):
+                c = (center + ring)[:, PLOT_AXES]
+                line.set_data(c[:, 0], c[:, 1])
+                line.set_3d_properties(c[:, 2])
 
         label_at_point(self.ax, self.A1_label, A1)
         label_at_point(self.ax, self.A2_label, A2)
@@ -188,33 +210,33 @@ class Cycle3DSimulator:
             f"Cycle angular vel = {angular_velocity_deg_s: .2f} °/s"
         )
 
-        return (
-            self.O_dot, self.O1_dot, self.O2_dot, self.A1_dot, self.A2_dot,
-            self.link_line, self.circle1_line, self.circle2_line,
-            self.A1_label, self.A2_label, self.coord_text
-        )
-
     def on_key(self, event):
-        if event.key == 'left':
-            self.rotation_y -= self.STEP
-        if event.key == 'right':
-            self.rotation_y += self.STEP
-        if event.key == 'up':
-            self.cycle_speed += self.cycle_speed_step
-        if event.key == 'down':
-            self.cycle_speed -= self.cycle_speed_step
+        with self._lock:
+            if event.key == 'left':
+                self.rotation_y -= self.STEP
+            if event.key == 'right':
+                self.rotation_y += self.STEP
+            if event.key == 'up':
+                self.cycle_speed += self.cycle_speed_step
+            if event.key == 'down':
+                self.cycle_speed -= self.cycle_speed_step
 
     def run(self):
-        plt.show()
+        self.send_thread.start()
+        try:
+            plt.show()
+        finally:
+            self.stop()
 
 
 def main():
     parser = argparse.ArgumentParser(description="Cycle 3D simulator (UDP angle/rudder sender)")
     parser.add_argument("--ip", default="127.0.0.1", help="Destination IP for UDP messages")
     parser.add_argument("--port", type=int, default=9000, help="Destination UDP port (default 9000)")
+    parser.add_argument("--send-hz", type=float, default=60.0, help="UDP send rate, independent of the frame rate (default 60)")
     args = parser.parse_args()
 
-    app = Cycle3DSimulator(udp_ip=args.ip, udp_port=args.port)
+    app = Cycle3DSimulator(udp_ip=args.ip, udp_port=args.port, send_hz=args.send_hz)
     app.run()
 
 
@@ -0,0 +1,216 @@
+import argparse
+import json
+import math
+import socket
+import time
+
+import numpy as np
+
+
+# ================= RIDERS =================
+
+class RiderFleet:
+    """N independent synthetic riders, all state kept in NumPy arrays.
+
+    Each rider has its own cadence (rotations per second), angle noise,
+    sinusoidal rudder trajectory and packet rate.
+    """
+
+    def __init__(self, n, rate_hz, cadence, noise_deg, rudder_amp_deg, rudder_period_s,
+                 radius=0.15, center=(0.0, 0.9, 0.0), pos_noise=0.0, seed=0):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+
+        self.cadence = self._per_rider(cadence)
+        self.period = 1.0 / self._per_rider(rate_hz)
+        self.noise_deg = noise_deg
+        self.rudder_amp = self._per_rider(rudder_amp_deg)
+        self.rudder_period = self._per_rider(rudder_period_s)
+        self.rudder_offset = self.rng.uniform(0.0, 2.0 * math.pi, n)
+
+        self.radius = radius
+        self.center = np.asarray(center, dtype=float)
+        self.pos_noise = pos_noise
+
+        # phase in degrees, unbounded; riders start spread around the crank
+        self.phase = self.rng.uniform(0.0, 360.0, n)
+        self.last_t = np.zeros(n)
+        # stagger first sends so riders don't all fire on the same tick
+        self.next_due = self.rng.uniform(0.0, 1.0, n) * self.period
+
+    def _per_rider(self, value):
+        """Scalar -> constant, (lo, hi) -> uniform per rider."""
+        if isinstance(value, (tuple, list)):
+            return self.rng.uniform(value[0], value[1], self.n)
+        return np.full(self.n, float(value))
+
+    def step(self, idx, t):
+        """Advance riders `idx` to time `t`; returns angle, velocity and rudder arrays."""
+        dt = t - self.last_t[idx]
+        velocity = 360.0 * self.cadence[idx]
+        self.phase[idx] += velocity * dt
+        self.last_t[idx] = t
+
+        angle = self.phase[idx]
+        if self.noise_deg > 0:
+            angle = angle + self.rng.normal(0.0, self.noise_deg, len(idx))
+        angle = angle % 360.0
+
+        rudder = self.rudder_amp[idx] * np.sin(
+            2.0 * math.pi * t / self.rudder_period[idx] + self.rudder_offset[idx]
+        )
+        return angle, velocity, rudder
+
+    def positions(self, angle_deg):
+        """Pedal positions on a crank in the YZ plane, angle 0 at the top
+        (the convention of angle_deg_from_highest)."""
+        a = np.radians(angle_deg)
+        pos = np.empty((len(a), 3))
+        pos[:, 0] = self.center[0]
+        pos[:, 1] = self.center[1] + self.radius * np.cos(a)
+        pos[:, 2] = self.center[2] + self.radius * np.sin(a)
+        if self.pos_noise > 0:
+            pos += self.rng.normal(0.0, self.pos_noise, pos.shape)
+        return pos
+
+
+# ================= SENDER =================
+
+class LoadGenerator:
+    def __init__(self, fleet, ip="127.0.0.1", port=9000, port_stride=0, mode="angle", tag=False):
+        self.fleet = fleet
+        self.mode = mode
+        self.tag = tag
+        self.addrs = [(ip, port + i * port_stride) for i in range(fleet.n)]
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if ip.endswith(".255"):
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        self.sent = 0
+        self.errors = 0
+        self.late = 0
+
+    def close(self):
+        self.sock.close()
+
+    def _packets(self, idx, t, wall_ts):
+        angle, velocity, rudder = self.fleet.step(idx, t)
+        if self.mode == "xyz":
+            # UdpTrackerSource schema
+            for i, (x, y, z) in zip(idx.tolist(), self.fleet.positions(angle).tolist()):
+                msg = {"x": x, "y": y, "z": z, "ts": wall_ts}
+                if self.tag:
+                    msg["rider"] = i
+                yield i, msg
+        else:
+            # Docs/PortTraffic.md port 9000 schema
+            for i, a, v, r in zip(idx.tolist(), angle.tolist(), velocity.tolist(), rudder.tolist()):
+                msg = {"angle_deg": a, "angular_velocity": v, "rudder_deg": r, "ts": wall_ts}
+                if self.tag:
+                    msg["rider"] = i
+                yield i, msg
+
+    def tick(self, t):
+        """Send every packet due at `t`; returns the time of the next one."""
+        fleet = self.fleet
+        idx = np.flatnonzero(fleet.next_due <= t)
+        if len(idx):
+            wall_ts = time.time()
+            for i, msg in self._packets(idx, t, wall_ts):
+                try:
+                    self.sock.sendto(json.dumps(msg).encode("utf-8"), self.addrs[i])
+                    self.sent += 1
+                except OSError:
+                    self.errors += 1
+
+            fleet.next_due[idx] += fleet.period[idx]
+            # a rider more than one period behind skips ahead instead of bursting
+            behind = fleet.next_due[idx] < t
+            if behind.any():
+                self.late += int(behind.sum())
+                fleet.next_due[idx[behind]] = t + fleet.period[idx[behind]]
+        return fleet.next_due.min()
+
+    def run(self, duration=None, report_s=1.0):
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        last_report, last_cpu, last_sent = start, cpu_start, 0
+        target_hz = float(np.sum(1.0 / self.fleet.period))
+
+        while True:
+            now = time.perf_counter()
+            t = now - start
+            if duration is not None and t >= duration:
+                break
+
+            next_t = self.tick(t)
+
+            if now - last_report >= report_s:
+                cpu = time.process_time()
+                wall = now - last_report
+                sent = self.sent - last_sent
+                cpu_pct = 100.0 * (cpu - last_cpu) / wall
+                us_per_pkt = 1e6 * (cpu - last_cpu) / sent if sent else 0.0
+                print(
+                    f"[{t:7.1f}s] rate={sent / wall:8.0f}/s (target {target_hz:.0f}) "
+                    f"cpu={cpu_pct:5.1f}% ({us_per_pkt:.1f} us/pkt) "
+                    f"late={self.late} errors={self.errors}"
+                )
+                last_report, last_cpu, last_sent = now, cpu, self.sent
+
+            delay = next_t - (time.perf_counter() - start)
+            if delay > 0.0005:
+                time.sleep(min(delay, report_s))
+
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        print(
+            f"sent {self.sent} packets in {elapsed:.1f}s: {self.sent / elapsed:.0f}/s "
+            f"(target {target_hz:.0f}/s), cpu {cpu:.2f}s "
+            f"({1e6 * cpu / max(1, self.sent):.1f} us/pkt), late={self.late} errors={self.errors}"
+        )
+
+
+def _range(text):
+    """'1.0' -> 1.0, '0.5:1.5' -> (0.5, 1.5) (uniform per rider)."""
+    if ":" in text:
+        lo, hi = text.split(":", 1)
+        return (float(lo), float(hi))
+    return float(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless multi-rider UDP load generator")
+    parser.add_argument("--ip", default="127.0.0.1", help="Destination IP for UDP messages")
+    parser.add_argument("--port", type=int, default=9000, help="Destination UDP port (default 9000)")
+    parser.add_argument("--port-stride", type=int, default=0, help="Rider i sends to port + i * stride (default 0: all on one port)")
+    parser.add_argument("--riders", type=int, default=10, help="Number of simulated riders")
+    parser.add_argument("--rate", type=_range, default=100.0, help="Packets per second per rider, value or lo:hi")
+    parser.add_argument("--cadence", type=_range, default=(0.5, 1.5), help="Rotations per second, value or lo:hi (default 0.5:1.5)")
+    parser.add_argument("--noise", type=float, default=0.5, help="Angle noise std dev in degrees")
+    parser.add_argument("--rudder-amp", type=_range, default=15.0, help="Rudder amplitude in degrees, value or lo:hi")
+    parser.add_argument("--rudder-period", type=_range, default=(4.0, 10.0), help="Rudder period in seconds, value or lo:hi")
+    parser.add_argument("--mode", choices=("angle", "xyz"), default="angle", help="angle: port 9000 packets, xyz: raw positions for UdpTrackerSource")
+    parser.add_argument("--pos-noise", type=float, default=0.002, help="xyz mode: position noise std dev in meters")
+    parser.add_argument("--tag", action="store_true", help="Add a 'rider' index field to every packet")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    fleet = RiderFleet(
+        args.riders, args.rate, args.cadence, args.noise, args.rudder_amp, args.rudder_period,
+        pos_noise=args.pos_noise, seed=args.seed,
+    )
+    gen = LoadGenerator(fleet, ip=args.ip, port=args.port, port_stride=args.port_stride, mode=args.mode, tag=args.tag)
+    print(f"Sending {args.mode} packets for {args.riders} riders to {args.ip}:{args.port}")
+
+    try:
+        gen.run(duration=args.duration)
+    except KeyboardInterrupt:
+        print("\nShutdown")
+    finally:
+        gen.close()
+
+
+if __name__ == "__main__":
+    main()
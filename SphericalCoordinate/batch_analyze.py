@@ -0,0 +1,238 @@
+import argparse
+import csv
+import glob
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# polar_utils imports pygame; keep its banner out of every worker's output
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from utils.cadence import analyze_angles
+from utils.polar_utils import best_fit_3d_circle
+
+
+COVERAGE_BINS = 36
+CADENCE_WINDOW_S = 0.25
+# dt used when a recording has neither per-sample times nor duration_sec
+DEFAULT_RATE_HZ = 60.0
+
+REPORT_FIELDS = [
+    "path", "error", "samples", "duration_s", "rate_hz",
+    "center_x", "center_y", "center_z", "normal_x", "normal_y", "normal_z",
+    "radius", "plane_rms", "plane_max", "radial_rms", "radial_max",
+    "coverage", "cadence_mean_rpm", "cadence_p10_rpm", "cadence_p50_rpm", "cadence_p90_rpm",
+    "backwards_frac", "cadence_fft_rpm", "smoothness", "dead_spot_angle_deg", "dead_spot_ratio",
+    "fit_ms",
+]
+
+
+# ================= PER RECORDING (runs in a worker) =================
+
+def load_recording(path):
+    """(positions (N, 3), times (N,)) of a sphere_positions-style JSON recording."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+
+    samples = raw.get("samples", []) if isinstance(raw, dict) else raw
+    positions = []
+    times = []
+    for item in samples:
+        if isinstance(item, dict):
+            pos = item.get("pos") or item.get("position") or item.get("p")
+            if pos is None and all(k in item for k in ("x", "y", "z")):
+                pos = (item["x"], item["y"], item["z"])
+            t = item.get("t", item.get("ts"))
+        else:
+            pos, t = item, None
+        if not pos or len(pos) < 3:
+            continue
+        positions.append(pos[:3])
+        times.append(t)
+
+    n = len(positions)
+    if n and all(t is not None for t in times):
+        t = np.asarray(times, dtype=float)
+    else:
+        duration = raw.get("duration_sec") if isinstance(raw, dict) else None
+        count = raw.get("count", n) if isinstance(raw, dict) else n
+        dt = duration / count if duration and count else 1.0 / DEFAULT_RATE_HZ
+        t = np.arange(n) * dt
+    return np.asarray(positions, dtype=float).reshape(-1, 3), t
+
+
+def plane_basis(normal):
+    n = np.asarray(normal, dtype=float)
+    # u: world up projected into the plane, so angle 0 is the top of the crank
+    up = np.array([0.0, 1.0, 0.0])
+    u = up - np.dot(up, n) * n
+    if np.linalg.norm(u) < 1e-9:
+        u = np.array([1.0, 0.0, 0.0]) - n[0] * n
+    u /= np.linalg.norm(u)
+    return u, np.cross(n, u)
+
+
+def analyze_recording(path):
+    """Fit and per-session stats for one recording; only a small dict goes back."""
+    row = {"path": path, "error": ""}
+    try:
+        pts, t = load_recording(path)
+        row["samples"] = len(pts)
+        if len(pts) < 3:
+            row["error"] = "too few samples"
+            return row
+        row["duration_s"] = float(t[-1] - t[0])
+        row["rate_hz"] = (len(t) - 1) / row["duration_s"] if row["duration_s"] > 0 else 0.0
+
+        start = time.perf_counter()
+        fit = best_fit_3d_circle(pts.tolist())
+        row["fit_ms"] = (time.perf_counter() - start) * 1000.0
+        if fit is None:
+            row["error"] = "fit failed"
+            return row
+        center, normal, radius = fit
+        row.update(zip(("center_x", "center_y", "center_z"), center))
+        row.update(zip(("normal_x", "normal_y", "normal_z"), normal))
+        row["radius"] = radius
+
+        d = pts - np.asarray(center)
+        h = d @ np.asarray(normal)
+        q = d - h[:, None] * np.asarray(normal)
+        radial = np.linalg.norm(q, axis=1) - radius
+        row["plane_rms"] = float(np.sqrt(np.mean(h * h)))
+        row["plane_max"] = float(np.abs(h).max())
+        row["radial_rms"] = float(np.sqrt(np.mean(radial * radial)))
+        row["radial_max"] = float(np.abs(radial).max())
+
+        u, w = plane_basis(normal)
+        angle = np.degrees(np.arctan2(q @ w, q @ u)) % 360.0
+        bins = np.unique((angle * COVERAGE_BINS / 360.0).astype(int) % COVERAGE_BINS)
+        row["coverage"] = len(bins) / COVERAGE_BINS
+
+        # cadence over CADENCE_WINDOW_S of unwrapped phase, not sample to sample
+        phase = np.concatenate(([0.0], np.cumsum((np.diff(angle) + 180.0) % 360.0 - 180.0)))
+        k = max(1, int(round(row["rate_hz"] * CADENCE_WINDOW_S)))
+        dt = t[k:] - t[:-k]
+        ok = dt > 0
+        if ok.any():
+            rpm = (phase[k:] - phase[:-k])[ok] / dt[ok] / 6.0
+            # the crank direction is whichever way most samples turn
+            if np.median(rpm) < 0:
+                rpm = -rpm
+            row["cadence_mean_rpm"] = float(rpm.mean())
+            row["cadence_p10_rpm"], row["cadence_p50_rpm"], row["cadence_p90_rpm"] = (
+                float(v) for v in np.percentile(rpm, [10, 50, 90])
+            )
+            row["backwards_frac"] = float(np.mean(rpm < 0))
+
+        stroke = analyze_angles(t, angle)
+        row["cadence_fft_rpm"] = stroke["cadence_rpm"]
+        row["smoothness"] = stroke["smoothness"]
+        row["dead_spot_angle_deg"] = stroke["dead_spot_angle_deg"]
+        row["dead_spot_ratio"] = stroke["dead_spot_ratio"]
+    except Exception as exc:  # one bad file must not take the batch down
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    return row
+
+
+# ================= BATCH =================
+
+def find_recordings(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(glob.glob(os.path.join(item, "**", "*.json"), recursive=True))
+        else:
+            paths.extend(glob.glob(item) or [item])
+    return sorted(set(paths))
+
+
+def run_batch(paths, workers=None, max_tasks_per_child=16):
+    """Analyze `paths` over a process pool; yields rows as they finish.
+
+    At most 2 x workers files are in flight, and each worker process is
+    replaced after `max_tasks_per_child` recordings, so memory stays bounded
+    however long the list is.
+    """
+    workers = workers or os.cpu_count() or 1
+    # max_tasks_per_child needs a non-fork start method
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, max_tasks_per_child=max_tasks_per_child) as pool:
+        todo = iter(paths)
+        running = set()
+        while True:
+            for path in todo:
+                running.add(pool.submit(analyze_recording, path))
+                if len(running) >= 2 * workers:
+                    break
+            if not running:
+                return
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def write_report(rows, out_path):
+    rows = sorted(rows, key=lambda r: r["path"])
+    if out_path.endswith(".npz"):
+        columns = {}
+        for field in REPORT_FIELDS:
+            values = [r.get(field) for r in rows]
+            if field in ("path", "error"):
+                columns[field] = np.array(values, dtype=str)
+            else:
+                columns[field] = np.array([math.nan if v is None else v for v in values], dtype=float)
+        np.savez(out_path, **columns)
+    else:
+        with open(out_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            for r in rows:
+                writer.writerow({k: r.get(k, "") for k in REPORT_FIELDS})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit circles and summarize many recordings in parallel")
+    parser.add_argument("inputs", nargs="+", help="Recording files, globs or directories (searched for *.json)")
+    parser.add_argument("--out", default="batch_report.csv", help="Report path, .csv or .npz")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--max-tasks-per-child", type=int, default=16, help="Recordings per worker before it is replaced")
+    parser.add_argument("--serial", action="store_true", help="Analyze in this process (for comparison/debugging)")
+    args = parser.parse_args()
+
+    paths = find_recordings(args.inputs)
+    if not paths:
+        print("No recordings found.")
+        return
+
+    start = time.perf_counter()
+    if args.serial:
+        rows_iter = map(analyze_recording, paths)
+    else:
+        rows_iter = run_batch(paths, workers=args.workers, max_tasks_per_child=args.max_tasks_per_child)
+
+    rows = []
+    for row in rows_iter:
+        rows.append(row)
+        if row["error"]:
+            print(f"[{len(rows)}/{len(paths)}] {row['path']}: ERROR {row['error']}")
+        else:
+            print(
+                f"[{len(rows)}/{len(paths)}] {row['path']}: r={row['radius']:.4f} m "
+                f"plane_rms={row['plane_rms'] * 1000:.1f} mm coverage={row['coverage']:.0%} "
+                f"cadence p50={row.get('cadence_p50_rpm', math.nan):.0f} rpm"
+            )
+    elapsed = time.perf_counter() - start
+
+    write_report(rows, args.out)
+    failed = sum(1 for r in rows if r["error"])
+    print(f"{len(rows)} recordings ({failed} failed) in {elapsed:.2f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
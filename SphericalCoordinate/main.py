@@ -1,11 +1,13 @@
 from models.tracker_runner import TrackerRunner
 from tracker_source.json_tracker import JsonTrackerSource
+from tracker_source.kalman_tracker import KalmanTrackerSource
 from tracker_source.openvr_tracker import OpenVRTrackerSource
+from tracker_source.replay_tracker import ReplayTrackerSource
 from tracker_source.vive_tracker import ViveTrackers
 from models.broadcaster import TrackerUdpBroadcaster
+from models.shm_ring import ShmRingWriter
 from models.states import TrackerState
-
-import time
+from utils.adaptive_rate import AdaptiveRate
 
 
 def run_tracker(
@@ -17,7 +19,7 @@ def run_tracker(
         is_return = runner.tick()
         if is_return:
             break
-        time.sleep(0.001)
+        runner.clock.sleep(0.001)
 
     # finally:
     #     udp.close()
@@ -29,12 +31,38 @@ def main():
     LAN_IP = "255.255.255.255"
     LOCALHOST_IP = "127.0.0.1"
     SEND_HZ = 10.0
+    # e.g. 90.0: stream a smoothed angle at display rate, polling the tracker at SEND_HZ
+    OUTPUT_HZ = None
+    
+    # refit the vertical circle in the background if the bike moves while streaming
+    AUTO_RECALIBRATE = True
+    
+    # TDC/BDC events for consumers that only need revolutions (None to disable)
+    EVENT_PORT = 9005
+    
+    # e.g. 1.0: angle packets per second while the crank and rudder are still; only for
+    # consumers that hold the last angle between packets (None: always full rate)
+    IDLE_HZ = None
+    
+    # shared-memory ring for readers on this PC, e.g. udp_client_vis.py --shm (None to disable)
+    SHM_NAME = "spherical_tracker"
+    
+    # "hold", "clamp" or "drop" tracker poses off the fitted circle (None: no gate)
+    GATE_POLICY = None
     
-    udp = TrackerUdpBroadcaster(ip=LOCALHOST_IP, port=9000)
+    udp = TrackerUdpBroadcaster(
+        ip=LOCALHOST_IP, port=9000, recalibrate=AUTO_RECALIBRATE, event_port=EVENT_PORT,
+        gate_policy=GATE_POLICY,
+        adaptive_rate=AdaptiveRate(min_hz=IDLE_HZ, max_hz=OUTPUT_HZ or SEND_HZ) if IDLE_HZ else None,
+        shm=ShmRingWriter(SHM_NAME) if SHM_NAME else None,
+    )
     # tracker1 =  ViveTrackers(JsonTrackerSource("sphere_positions_vertical.json", loop=True)) 
     # tracker2 =  ViveTrackers(JsonTrackerSource("sphere_positions_horizontal.json", loop=True))
+    # replay at capture timing (speed=1.0), N x faster (speed=N) or as fast as possible (speed=None)
+    # tracker = ViveTrackers(ReplayTrackerSource("sphere_positions_vertical.json", speed=1.0))
+    # smooth tracker jitter: ViveTrackers(KalmanTrackerSource(OpenVRTrackerSource()))
     tracker = ViveTrackers(OpenVRTrackerSource())
-    runner = TrackerRunner(udp, tracker, send_hz=SEND_HZ)
+    runner = TrackerRunner(udp, tracker, send_hz=SEND_HZ, output_hz=OUTPUT_HZ)
 
     while True:
         cmd = input("> ").strip().lower()
@@ -1,15 +1,23 @@
 import json
 import socket
-import time
 
+from models.clock import REAL_CLOCK
+from models.recalibrator import DriftRecalibrator
 from utils.polar_utils import (
     best_fit_3d_circle, line_origin_to_highest_y,
     angle_deg_from_highest
 )
+from utils.circle_gate import CircleGate, GATE_DROP
+from utils.dead_center import DeadCenterDetector
+from utils.phase_tracker import AlphaBetaPhaseTracker
+from utils.velocity_estimator import PhaseVelocityEstimator
 
 class TrackerUdpBroadcaster:
-    def __init__(self, ip="255.255.255.255", port=9000, broadcast=True):
-        
+    def __init__(self, ip="255.255.255.255", port=9000, broadcast=True, clock=None, velocity_window=8,
+                 gate_policy=None, gate_plane_tol=0.03, gate_radial_tol=0.03,
+                 recalibrate=False, event_port=None, adaptive_rate=None, shm=None):
+        self.clock = clock or REAL_CLOCK
+
         # --- Network ---
         self.addr = (ip, port)
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -24,18 +32,46 @@ class TrackerUdpBroadcaster:
         self._init_pointsV = []
         self._init_pointsH = []
         
-        self.prev_ang = 0
-        self.prev_time = 0
+        # angular velocity from sample timestamps, not send times
+        self.velocity_estimator = PhaseVelocityEstimator(window=velocity_window)
+        # smooth phase for streaming above the tracker poll rate
+        self.phase_tracker = AlphaBetaPhaseTracker()
+
+        # --- Outlier gate, opt-in via gate_policy (built once the vertical circle is known) ---
+        self.gate_policy = gate_policy
+        self.gate_plane_tol = gate_plane_tol
+        self.gate_radial_tol = gate_radial_tol
+        self.gate = None
+        self._last_angle = None
+
+        # --- Dead-center event stream (low-rate alternative to angles) ---
+        self.event_addr = (ip, event_port) if event_port else None
+        self.dead_center = DeadCenterDetector() if event_port else None
+        self._event_seq = 0
+
+        # --- Same-host sink (models.shm_ring.ShmRingWriter), written alongside UDP ---
+        self.shm = shm
+
+        # --- Heartbeat rate while the crank is still (utils.adaptive_rate.AdaptiveRate) ---
+        self.adaptive_rate = adaptive_rate
+
+        # --- Background recalibration while streaming ---
+        self.recalibrator = DriftRecalibrator(clock=self.clock) if recalibrate else None
+        self.recalibrations = 0
 
     def close(self):
+        if self.recalibrator is not None:
+            self.recalibrator.shutdown()
+        if self.shm is not None:
+            self.shm.close()
         self.sock.close()
 
     def _update_vertical_circle(self, pos):
         self._init_pointsV.append([pos[0], pos[1], pos[2]])
         if len(self._init_pointsV) >= self.num_point_init:
-            _circle = best_fit_3d_circle(self._init_pointsV)
-            self.centerV, self.v_normV, self.radiusV = _circle
-            self.ref_lineV = line_origin_to_highest_y(self._init_pointsV, self.centerV)
+            center, normal, radius = best_fit_3d_circle(self._init_pointsV)
+            ref_line = line_origin_to_highest_y(self._init_pointsV, center)
+            self._set_vertical_circle(center, normal, radius, ref_line)
             self._init_pointsV = []
             return True
         return False
@@ -49,6 +85,47 @@ class TrackerUdpBroadcaster:
             return True
         return False
     
+    def _set_vertical_circle(self, center, normal, radius, ref_line):
+        self.centerV, self.v_normV, self.radiusV = center, normal, radius
+        self.ref_lineV = ref_line
+        self._build_gate()
+        if self.recalibrator is not None:
+            self.recalibrator.set_reference(center, normal, radius)
+        # angles from the old geometry are offset from the new ones; the jump is not motion
+        self.velocity_estimator.restart()
+        self.phase_tracker.restart()
+        if self.dead_center is not None:
+            self.dead_center.restart()
+        self._last_angle = None
+
+    def _gate_active(self):
+        # while the circle is known to have moved, let samples through for the refit
+        if self.gate is None:
+            return False
+        return self.recalibrator is None or not self.recalibrator.drifting
+
+    def _observe_drift(self, pos):
+        if self.recalibrator is None:
+            return
+        geometry = self.recalibrator.observe(pos)
+        if geometry is None:
+            return
+        # swap and re-broadcast between two samples; streaming never stops
+        self._set_vertical_circle(*geometry)
+        self.recalibrations += 1
+        self.send_circle(self.centerV, self.v_normV, self.radiusV)
+        self.send_ref_line()
+
+    def _build_gate(self):
+        if self.gate_policy is None:
+            self.gate = None
+            return
+        self.gate = CircleGate(
+            self.centerV, self.v_normV, self.radiusV,
+            plane_tol=self.gate_plane_tol, radial_tol=self.gate_radial_tol,
+            policy=self.gate_policy,
+        )
+
     def angle_diff_deg(self, curr, prev):
         diff = curr - prev
         if diff > 180:
@@ -62,37 +139,98 @@ class TrackerUdpBroadcaster:
         if pos is None:
             return
 
+        ts = self.clock.time()
+        if self.shm is not None:
+            self.shm.write_xyz(pos, ts)
         packet = json.dumps(
             {
                 "x": pos[0],
                 "y": pos[1],
                 "z": pos[2],
-                "ts": time.time(),
+                "ts": ts,
             }
         ).encode("utf-8")
         self.sock.sendto(packet, self.addr)
         
-    def send_degree_position(self, pos):
+    def send_degree_position(self, pos, sample_t=None):
+        """Send the crank angle of `pos`. `sample_t` is when the sample was
+        captured (any monotonic timeline); repeats of the same sample_t do not
+        move the velocity estimate."""
         if pos is None:
             return
 
         if self.centerV is None or self.ref_lineV is None:
             return
 
+        self._observe_drift(pos)
+        ts = self.clock.time()
+        if self._gate_active():
+            pos = self.gate.apply(pos)
+            if pos is None:
+                if self.gate.policy != GATE_DROP and self._last_angle is not None:
+                    # outlier: repeat the last good angle, velocity unchanged
+                    self._send_angle(self._last_angle, self.velocity_estimator.velocity, ts)
+                    return self._last_angle
+                return
+
         origin, highest = self.ref_lineV
         angle_deg = angle_deg_from_highest(origin, highest, pos)
-        ts = time.time()
-        
-        dt = ts - self.prev_time if self.prev_time else 0.0
-        if dt > 0:
-            d_angle = self.angle_diff_deg(angle_deg, self.prev_ang)
-            angular_velocity = d_angle / dt
-        else:
-            angular_velocity = 0.0
-
-        self.prev_time = ts
-        self.prev_ang = angle_deg
-        
+        self._last_angle = angle_deg
+        if sample_t is None:
+            sample_t = self.clock.monotonic()
+        angular_velocity = self.velocity_estimator.update(angle_deg, sample_t)
+        self._send_angle(angle_deg, angular_velocity, ts)
+        self._detect_events(angle_deg, sample_t, ts)
+        return angle_deg
+
+    def update_phase(self, pos, sample_t=None):
+        """Feed a polled sample to the phase tracker without sending (see send_phase)."""
+        if pos is None:
+            return
+
+        if self.centerV is None or self.ref_lineV is None:
+            return
+
+        self._observe_drift(pos)
+        if self._gate_active():
+            pos = self.gate.apply(pos)
+            if pos is None:
+                # outlier: the phase tracker keeps extrapolating the last good phase
+                return
+
+        origin, highest = self.ref_lineV
+        angle_deg = angle_deg_from_highest(origin, highest, pos)
+        now = self.clock.monotonic()
+        self.phase_tracker.update(angle_deg, sample_t, now)
+        self._detect_events(angle_deg, now if sample_t is None else sample_t, self.clock.time())
+        return angle_deg
+
+    def send_phase(self):
+        """Send the phase tracker's angle and velocity for the current time."""
+        angle_deg, angular_velocity = self.phase_tracker.predict(self.clock.monotonic())
+        if angle_deg is None:
+            return
+        self._send_angle(angle_deg, angular_velocity, self.clock.time())
+        return angle_deg
+
+    def _detect_events(self, angle_deg, sample_t, ts):
+        if self.dead_center is None:
+            return
+        for event in self.dead_center.update(angle_deg, sample_t):
+            # the crossing happened (sample_t - t) before this sample, which is now
+            event["ts"] = ts - (sample_t - event.pop("t"))
+            self._event_seq += 1
+            event["seq"] = self._event_seq
+            self.sock.sendto(json.dumps(event).encode("utf-8"), self.event_addr)
+
+    def _send_angle(self, angle_deg, angular_velocity, ts):
+        # local readers get every sample; the idle heartbeat only saves the network
+        if self.shm is not None:
+            self.shm.write_angle(angle_deg, angular_velocity, 0.0, ts)
+        if self.adaptive_rate is not None and not self.adaptive_rate.should_send(
+            self.clock.monotonic(), angle_deg, angular_velocity or 0.0
+        ):
+            return
         packet = json.dumps(
             {
                 "angle_deg": angle_deg,
@@ -102,15 +240,17 @@ class TrackerUdpBroadcaster:
             }
         ).encode("utf-8")
         self.sock.sendto(packet, self.addr)
-        return angle_deg
 
     def send_circle(self, c, n, r):        
+        ts = self.clock.time()
+        if self.shm is not None and c is not None:
+            self.shm.write_circle(c, n, r, ts)
         packet = json.dumps(
             {
                 "center": c,
                 "normal": n,
                 "radius": r,
-                "ts": time.time(),
+                "ts": ts,
                 "type": "circle",
             }
         ).encode("utf-8")
@@ -121,11 +261,14 @@ class TrackerUdpBroadcaster:
             return
 
         origin, highest = self.ref_lineV
+        ts = self.clock.time()
+        if self.shm is not None:
+            self.shm.write_refline(origin, highest, ts)
         packet = json.dumps(
             {
                 "origin": origin,
                 "highest": highest,
-                "ts": time.time(),
+                "ts": ts,
                 "type": "refline",
             }
         ).encode("utf-8")
@@ -0,0 +1,62 @@
+# tracker/clock.py
+import time
+from abc import ABC, abstractmethod
+
+
+class Clock(ABC):
+    """Time source shared by the runner, broadcaster and replay sources.
+
+    `monotonic()` drives scheduling, `time()` stamps packets (epoch seconds).
+    """
+
+    @abstractmethod
+    def monotonic(self):
+        pass
+
+    @abstractmethod
+    def time(self):
+        pass
+
+    @abstractmethod
+    def sleep(self, dt):
+        pass
+
+
+class RealClock(Clock):
+    def monotonic(self):
+        return time.perf_counter()
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, dt):
+        if dt > 0:
+            time.sleep(dt)
+
+
+class SimulatedClock(Clock):
+    """Deterministic clock that only moves when slept on or advanced.
+
+    Sleeping costs no wall time, so an hour-long session runs as fast as
+    the code under test allows.
+    """
+
+    def __init__(self, start=0.0, epoch=0.0):
+        self._t = float(start)
+        self.epoch = float(epoch)
+
+    def monotonic(self):
+        return self._t
+
+    def time(self):
+        return self.epoch + self._t
+
+    def sleep(self, dt):
+        if dt > 0:
+            self._t += dt
+
+    def advance(self, dt):
+        self.sleep(dt)
+
+
+REAL_CLOCK = RealClock()
@@ -0,0 +1,131 @@
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from models.clock import REAL_CLOCK
+from utils.circle_gate import CircleGate
+from utils.polar_utils import best_fit_3d_circle, line_origin_to_highest_y
+
+
+def refit_circle(points, drift_tol, coverage_bins=12, min_coverage=9):
+    """Fit a new circle to `points`; None if the window can't be trusted.
+
+    The window must go around the crank (at least `min_coverage` of
+    `coverage_bins` angle sectors hit) and fit its own circle within
+    `drift_tol`, otherwise a rider standing still or a burst of bad poses
+    would replace a good calibration with a bad one.
+    """
+    fit = best_fit_3d_circle(points)
+    if fit is None:
+        return None
+    center, normal, radius = fit
+
+    check = CircleGate(center, normal, radius)
+    # in-plane basis for the coverage test
+    nx, ny, nz = check.nx, check.ny, check.nz
+    ux, uy, uz = (1.0, 0.0, 0.0) if abs(nx) < 0.9 else (0.0, 1.0, 0.0)
+    d = ux * nx + uy * ny + uz * nz
+    ux, uy, uz = ux - d * nx, uy - d * ny, uz - d * nz
+    wx, wy, wz = ny * uz - nz * uy, nz * ux - nx * uz, nx * uy - ny * ux
+
+    sectors = set()
+    residual = 0.0
+    for p in points:
+        h, radial, (qx, qy, qz, _) = check.errors(p)
+        residual += math.sqrt(h * h + radial * radial)
+        a = math.atan2(qx * wx + qy * wy + qz * wz, qx * ux + qy * uy + qz * uz)
+        sectors.add(int((a + math.pi) / (2.0 * math.pi) * coverage_bins) % coverage_bins)
+    residual /= len(points)
+
+    if len(sectors) < min_coverage or residual > drift_tol:
+        return None
+    return center, normal, radius, line_origin_to_highest_y(points, center)
+
+
+class DriftRecalibrator:
+    """Watches streamed positions and refits the circle when they drift off it.
+
+    Every observed position updates an EWMA of its distance to the current
+    circle. Once the EWMA exceeds `drift_tol` (meters) the next `window`
+    positions are collected and refit on a worker thread; the caller keeps
+    streaming and picks the result up from a later observe(), on its own
+    thread, so the geometry swap never races the streaming code. Refits are
+    at least `min_interval_s` apart.
+    """
+
+    def __init__(self, window=180, drift_tol=0.01, ewma_alpha=0.02, min_interval_s=5.0,
+                 coverage_bins=12, min_coverage=9, clock=None):
+        self.window = window
+        self.drift_tol = drift_tol
+        self.ewma_alpha = ewma_alpha
+        self.min_interval_s = min_interval_s
+        self.coverage_bins = coverage_bins
+        self.min_coverage = min_coverage
+        self.clock = clock or REAL_CLOCK
+
+        self._points = deque(maxlen=window)
+        self._reference = None
+        self._pending = None
+        self._in_drift = False
+        self._last_refit = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recalibrate")
+
+        self.residual = 0.0
+        self.refits = 0
+        self.rejected_refits = 0
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def set_reference(self, center, normal, radius):
+        self._reference = CircleGate(center, normal, radius)
+        self.residual = 0.0
+        self._in_drift = False
+        # samples and refits from before the swap describe the old geometry
+        self._points.clear()
+        self._pending = None
+
+    @property
+    def drifting(self):
+        return self.residual > self.drift_tol
+
+    def observe(self, pos):
+        """Feed one raw position; returns (center, normal, radius, ref_line)
+        when a refit has finished and should be swapped in, else None."""
+        if self._reference is None:
+            return None
+
+        h, radial, _ = self._reference.errors(pos)
+        r = math.sqrt(h * h + radial * radial)
+        self.residual += self.ewma_alpha * (r - self.residual)
+
+        drifting = self.drifting
+        if drifting and not self._in_drift:
+            # refit only from samples taken after the drift began
+            self._points.clear()
+        self._in_drift = drifting
+        self._points.append((pos[0], pos[1], pos[2]))
+
+        if self._pending is not None:
+            if not self._pending.done():
+                return None
+            future, self._pending = self._pending, None
+            geometry = future.result()
+            if geometry is None:
+                self.rejected_refits += 1
+                return None
+            self.refits += 1
+            return geometry
+
+        now = self.clock.monotonic()
+        if (
+            drifting
+            and len(self._points) == self.window
+            and (self._last_refit is None or now - self._last_refit >= self.min_interval_s)
+        ):
+            self._last_refit = now
+            self._pending = self._executor.submit(
+                refit_circle, list(self._points), self.drift_tol,
+                self.coverage_bins, self.min_coverage,
+            )
+        return None
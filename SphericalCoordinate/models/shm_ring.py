@@ -0,0 +1,246 @@
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+DEFAULT_NAME = "spherical_tracker"
+DEFAULT_CAPACITY = 4096
+
+MAGIC = 0x53524E47  # "SRNG"
+VERSION = 1
+
+KIND_XYZ = 0
+KIND_ANGLE = 1
+KIND_CIRCLE = 2
+KIND_REFLINE = 3
+
+# data per kind:
+#   xyz      x, y, z
+#   angle    angle_deg, angular_velocity, rudder_deg
+#   circle   center(3), normal(3), radius
+#   refline  origin(3), highest(3)
+HEADER_DTYPE = np.dtype([
+    ("magic", "u4"), ("version", "u4"), ("capacity", "u8"),
+    ("epoch", "u8"), ("write_index", "u8"), ("open", "u8"),
+])
+HEADER_BYTES = 64
+RECORD_DTYPE = np.dtype([("seq", "u8"), ("ts", "f8"), ("kind", "i8"), ("data", "f8", (7,))])
+
+# blocks created by writers in this process (see ShmRingReader)
+_owned = set()
+
+
+def _size(capacity):
+    return HEADER_BYTES + capacity * RECORD_DTYPE.itemsize
+
+
+def _views(buf, capacity):
+    header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=buf)
+    records = np.ndarray((capacity,), dtype=RECORD_DTYPE, buffer=buf, offset=HEADER_BYTES)
+    return header, records
+
+
+class ShmRingWriter:
+    """Single-writer ring of fixed-size records in a named shared-memory block.
+
+    Record i lives in slot i % capacity and carries seq 2i+1 while it is
+    being written and 2i+2 once complete (a per-slot seqlock); the header's
+    write_index is bumped after the record is complete. Readers never block
+    the writer. Re-opening an existing block (e.g. after a crash) reuses it
+    and bumps `epoch` so attached readers start over.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, capacity=DEFAULT_CAPACITY):
+        self.name = name
+        self.capacity = capacity
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=_size(capacity))
+            epoch = 1
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name=name)
+            old = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+            epoch = int(old["epoch"][0]) + 1 if old["magic"][0] == MAGIC else 1
+            del old
+            if self.shm.size < _size(capacity):
+                self.shm.close()
+                self.shm.unlink()
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=_size(capacity))
+
+        _owned.add(name)
+        self._header, self._records = _views(self.shm.buf, capacity)
+        self._seq = self._records["seq"]
+        self._ts = self._records["ts"]
+        self._kind = self._records["kind"]
+        self._data = self._records["data"]
+
+        self._seq[:] = 0
+        h = self._header
+        h["capacity"], h["write_index"], h["epoch"], h["open"] = capacity, 0, epoch, 1
+        h["version"], h["magic"] = VERSION, MAGIC
+        self._next = 0
+
+    def close(self, unlink=True):
+        if self.shm is None:
+            return
+        self._header["open"] = 0
+        # numpy views must go before the mapping can be released
+        self._header = self._records = self._seq = self._ts = self._kind = self._data = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+        _owned.discard(self.name)
+        self.shm = None
+
+    def write(self, kind, ts, values):
+        i = self._next
+        k = i % self.capacity
+        self._seq[k] = 2 * i + 1
+        self._ts[k] = ts
+        self._kind[k] = kind
+        self._data[k, :len(values)] = values
+        self._seq[k] = 2 * i + 2
+        self._next = i + 1
+        self._header["write_index"] = self._next
+
+    def write_xyz(self, pos, ts):
+        self.write(KIND_XYZ, ts, pos[:3])
+
+    def write_angle(self, angle_deg, angular_velocity, rudder_deg, ts):
+        self.write(KIND_ANGLE, ts, (angle_deg, angular_velocity or 0.0, rudder_deg))
+
+    def write_circle(self, center, normal, radius, ts):
+        self.write(KIND_CIRCLE, ts, (*center, *normal, radius))
+
+    def write_refline(self, origin, highest, ts):
+        self.write(KIND_REFLINE, ts, (*origin, *highest))
+
+
+class ShmRingReader:
+    """Attaches to a ShmRingWriter's block by name.
+
+    read_new() returns every record written since the previous call as one
+    RECORD_DTYPE array (a single copy, no per-record decoding); latest()
+    returns only the newest record. Records the writer lapped before they
+    were read are counted in `lost`.
+    """
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.name = name
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # before 3.13 attaching registers the block with this process's
+            # resource tracker, which would unlink it when the reader exits
+            self.shm = shared_memory.SharedMemory(name=name)
+            if name not in _owned:
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        if header["magic"][0] != MAGIC or header["version"][0] != VERSION:
+            del header
+            self.shm.close()
+            raise ValueError(f"shared memory block {name!r} is not a tracker ring")
+        self.capacity = int(header["capacity"][0])
+        del header
+        self._header, self._records = _views(self.shm.buf, self.capacity)
+        self._seq = self._records["seq"]
+
+        self._epoch = None
+        self._cursor = 0
+        self.lost = 0
+
+    def close(self):
+        if self.shm is None:
+            return
+        self._header = self._records = self._seq = None
+        self.shm.close()
+        self.shm = None
+
+    @property
+    def writer_open(self):
+        return bool(self._header["open"][0])
+
+    def _sync(self):
+        end = int(self._header["write_index"][0])
+        epoch = int(self._header["epoch"][0])
+        if epoch != self._epoch or end < self._cursor:
+            # writer restarted: begin at its first record
+            self._epoch = epoch
+            self._cursor = 0
+        return end
+
+    def read_new(self, max_records=None):
+        end = self._sync()
+        # slot of record end - capacity may be mid-overwrite already
+        start = max(self._cursor, end - self.capacity + 1)
+        if max_records is not None:
+            start = max(start, end - max_records)
+        self.lost += start - self._cursor
+        self._cursor = end
+        if start >= end:
+            return np.empty(0, dtype=RECORD_DTYPE)
+
+        index = np.arange(start, end, dtype=np.uint64)
+        slots = index % self.capacity
+        records = self._records[slots]
+        # complete when copied and not rewritten while copying
+        ok = (records["seq"] == 2 * index + 2) & (self._seq[slots] == records["seq"])
+        if not ok.all():
+            self.lost += int((~ok).sum())
+            records = records[ok]
+        return records
+
+    def latest(self):
+        """Newest complete record, or None if nothing has been written."""
+        for _ in range(3):
+            end = self._sync()
+            if end == 0:
+                return None
+            i = end - 1
+            k = i % self.capacity
+            record = self._records[k].copy()
+            if record["seq"] == 2 * i + 2 and self._seq[k] == record["seq"]:
+                return record
+        return None
+
+
+def _bench(count=200_000, capacity=DEFAULT_CAPACITY):
+    import json
+    import time
+
+    writer = ShmRingWriter(name=f"{DEFAULT_NAME}_bench", capacity=capacity)
+    reader = ShmRingReader(name=writer.name)
+    try:
+        start = time.perf_counter()
+        got = 0
+        for i in range(count):
+            writer.write_angle(i % 360, 90.0, 0.0, float(i))
+            if i % 64 == 63:
+                records = reader.read_new()
+                got += len(records)
+                assert records["seq"][-1] == 2 * i + 2
+        got += len(reader.read_new())
+        shm_us = (time.perf_counter() - start) / count * 1e6
+        assert got == count and reader.lost == 0
+
+        start = time.perf_counter()
+        for i in range(count):
+            packet = json.dumps({"angle_deg": i % 360, "angular_velocity": 90.0, "rudder_deg": 0.0, "ts": float(i)})
+            json.loads(packet)
+        json_us = (time.perf_counter() - start) / count * 1e6
+
+        for i in range(capacity * 2):
+            writer.write_xyz((1.0, 2.0, 3.0), float(i))
+        records = reader.read_new()
+        print(
+            f"shm write+read {shm_us:.2f} us/record, json encode+decode alone {json_us:.2f} us/record; "
+            f"after lapping: {len(records)} read, {reader.lost} lost, latest seq {reader.latest()['seq']}"
+        )
+        assert len(records) == capacity - 1 and reader.lost == capacity + 1
+    finally:
+        reader.close()
+        writer.close()
+
+
+if __name__ == "__main__":
+    # run from SphericalCoordinate/: python -m models.shm_ring
+    _bench()
@@ -1,70 +1,121 @@
 # tracker/runner.py
-import time
+from models.clock import REAL_CLOCK
 from models.states import TrackerState
 from models.broadcaster import TrackerUdpBroadcaster
 from tracker_source import abc_tracker
 
+MIN_SLEEP_S = 1e-6
+
 class TrackerRunner:
     def __init__(self, 
         udp : TrackerUdpBroadcaster, 
         tracker : abc_tracker, 
-        send_hz=20.0):
+        send_hz=20.0,
+        clock=None,
+        verbose=True,
+        output_hz=None):
         
         self.udp = udp
         self.tracker = tracker
         self.send_dt = 1.0 / send_hz
+        # when set, STREAMING polls at send_hz and sends the phase tracker's
+        # output at output_hz (e.g. display rate)
+        self.output_dt = 1.0 / output_hz if output_hz else None
+        self.clock = clock or REAL_CLOCK
+        self.verbose = verbose
 
         self.state = TrackerState.STREAMING
-        self.last_time = time.perf_counter()
+        self.last_time = self.clock.monotonic()
         self.accumulator = 0.0
+        self.output_accumulator = 0.0
 
     def tick(self):
-        now = time.perf_counter()
+        now = self.clock.monotonic()
         dt = now - self.last_time
         self.last_time = now
         self.accumulator += dt
         is_return = False
 
         while self.accumulator >= self.send_dt:
-            pos = self.tracker.get_tracker_position()
-            is_return = self._handle_sample(pos)
+            pos, sample_t = self.tracker.get_tracker_sample()
+            if sample_t is None:
+                # nominal time of this send slot, so catch-up bursts stay evenly spaced
+                sample_t = now - (self.accumulator - self.send_dt)
+            is_return = self._handle_sample(pos, sample_t)
             self.accumulator -= self.send_dt
+
+        if self.output_dt is not None and self.state == TrackerState.STREAMING:
+            self.output_accumulator += dt
+            if self.output_accumulator >= self.output_dt:
+                # one output per tick: a late loop skips outputs instead of bursting
+                self.udp.send_phase()
+                self.output_accumulator %= self.output_dt
         
         return is_return
 
     def reset_timing(self):
-        self.last_time = time.perf_counter()
+        self.last_time = self.clock.monotonic()
         self.accumulator = 0.0
+        self.output_accumulator = 0.0
+
+    def time_until_next(self):
+        wait = self.send_dt - self.accumulator
+        if self.output_dt is not None and self.state == TrackerState.STREAMING:
+            wait = min(wait, self.output_dt - self.output_accumulator)
+        return max(0.0, wait)
+
+    def run_for(self, duration):
+        """Tick for `duration` seconds of clock time; True if the state returned.
 
-    def _handle_sample(self, pos):
+        Sleeps exactly until the next send, so with a SimulatedClock the
+        loop costs one iteration per sample rather than per millisecond.
+        """
+        self.reset_timing()
+        end = self.clock.monotonic() + duration
+        while self.clock.monotonic() < end:
+            if self.tick():
+                return True
+            # floor keeps a simulated clock moving when rounding leaves the
+            # accumulator a hair short of send_dt
+            self.clock.sleep(max(MIN_SLEEP_S, min(self.time_until_next(), end - self.clock.monotonic())))
+        return False
+
+    def _handle_sample(self, pos, sample_t=None):
         if pos == None:
             return False
         
         if self.state == TrackerState.COLLECT_VERTICAL:
             self.udp._update_vertical_circle(pos)
             if self.udp.centerV:
-                print("[DONE] Computing vertical circle!")
+                self._log("[DONE] Computing vertical circle!")
                 self.state = TrackerState.RETURN
         elif self.state == TrackerState.COLLECT_HORIZONTAL:
             self.udp._update_horizontal_circle(pos)
             if self.udp.centerH:
-                print("[DONE] Computing horizontal circle!")
+                self._log("[DONE] Computing horizontal circle!")
                 self.state = TrackerState.RETURN
         elif self.state == TrackerState.SEND_CIRCLE:
             self.udp.send_circle(self.udp.centerV, self.udp.v_normV, self.udp.radiusV)
             self.udp.send_circle(self.udp.centerH, self.udp.v_normH, self.udp.radiusH)
-            print("[DONE] Send circle!")
+            self._log("[DONE] Send circle!")
             self.state = TrackerState.RETURN
         elif self.state == TrackerState.SEND_REF_LINE:
             self.udp.send_ref_line()
         elif self.state == TrackerState.RETURN:
             return True
         elif self.state == TrackerState.STREAMING:
-            res = self.udp.send_degree_position(pos)
-            print(res)
+            if self.output_dt is not None:
+                res = self.udp.update_phase(pos, sample_t)
+            else:
+                res = self.udp.send_degree_position(pos, sample_t)
+            self._log(res)
             return False
         
         # --- STREAMING DATA ---
         self.udp.send_xyz_position(pos)
-        print(pos)
+        self._log(pos)
         return False
+
+    def _log(self, msg):
+        if self.verbose:
+            print(msg)
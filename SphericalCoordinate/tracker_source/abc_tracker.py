@@ -3,4 +3,9 @@ from abc import ABC, abstractmethod
 class TrackerSource(ABC):
     @abstractmethod
     def get_tracker_position(self):
-        pass
\ No newline at end of file
+        pass
+
+    def get_tracker_sample(self):
+        """(pos, t): t is the sample's capture time if the source knows it,
+        else None and the caller stamps it."""
+        return self.get_tracker_position(), None
\ No newline at end of file
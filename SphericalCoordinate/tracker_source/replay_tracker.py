@@ -0,0 +1,128 @@
+import bisect
+import json
+
+from models.clock import REAL_CLOCK
+from tracker_source.json_tracker import JsonTrackerSource
+
+
+class ReplayTrackerSource(JsonTrackerSource):
+    """Replays a recording on its own timeline instead of one sample per call.
+
+    Sample times come from a per-sample "t"/"ts" field, or are derived from
+    the header (`duration_sec` / `count`). `speed` sets the mode:
+    1.0 real time, N faster (or slower) than real time, None as fast as
+    possible (every call returns the next sample, no waiting).
+
+    In timed modes a call returns the newest sample due at the current
+    replay time; samples the caller was too slow to pick up are counted in
+    `skipped`, and `lag_s` is how old the returned sample is.
+    """
+
+    def __init__(self, path, loop=True, speed=1.0, clock=None):
+        with open(path) as f:
+            raw = json.load(f)
+        self.data = self._normalize(raw)
+        self.times = self._sample_times(raw, len(self.data))
+        self.index = 0
+        self.loop = loop
+        self.speed = speed
+        self.clock = clock or REAL_CLOCK
+
+        self.skipped = 0
+        self.lag_s = 0.0
+        self.max_lag_s = 0.0
+        self._start_wall = None
+        self._start_t = self.times[0] if self.times else 0.0
+
+    def _normalize(self, raw):
+        normalized = super()._normalize(raw)
+        samples = raw.get("samples") if isinstance(raw, dict) else raw
+        if isinstance(samples, list) and len(samples) == len(normalized):
+            for item, pos in zip(samples, normalized):
+                if isinstance(item, dict):
+                    t = item.get("t", item.get("ts"))
+                    if t is not None:
+                        pos["t"] = float(t)
+        return normalized
+
+    def _sample_times(self, raw, n):
+        if n and all("t" in pos for pos in self.data):
+            return [pos["t"] for pos in self.data]
+
+        duration = raw.get("duration_sec") if isinstance(raw, dict) else None
+        count = raw.get("count", n) if isinstance(raw, dict) else n
+        dt = duration / count if duration and count else 1.0 / 60.0
+        return [i * dt for i in range(n)]
+
+    @property
+    def duration(self):
+        return self.times[-1] - self.times[0] if self.times else 0.0
+
+    @property
+    def replay_time(self):
+        if self.speed is None:
+            return self.times[min(self.index, len(self.times) - 1)] if self.times else 0.0
+        if self._start_wall is None:
+            return self._start_t
+        return self._start_t + (self.clock.monotonic() - self._start_wall) * self.speed
+
+    def seek(self, t):
+        """Jump to recording time `t` (seconds on the recording's timeline)."""
+        self.index = min(bisect.bisect_left(self.times, t), len(self.times))
+        self._start_t = t
+        self._start_wall = self.clock.monotonic() if self._start_wall is not None else None
+
+    def reset_stats(self):
+        self.skipped = 0
+        self.lag_s = 0.0
+        self.max_lag_s = 0.0
+
+    def get_tracker_sample(self):
+        """(pos, t) of the sample due now, t on the recording's timeline."""
+        if not self.data:
+            return None, None
+
+        if self.speed is None:
+            if self.index >= len(self.data):
+                if not self.loop:
+                    return None, None
+                self.index = 0
+            i = self.index
+            self.index += 1
+            return self._position(i), self.times[i]
+
+        if self._start_wall is None:
+            self._start_wall = self.clock.monotonic()
+
+        now_t = self.replay_time
+        if now_t > self.times[-1] and self.index >= len(self.data):
+            if not self.loop:
+                return None, None
+            # restart the timeline at the first sample
+            self.index = 0
+            self._start_t = self.times[0]
+            self._start_wall = self.clock.monotonic()
+            now_t = self._start_t
+
+        # newest sample with t <= replay time
+        due = bisect.bisect_right(self.times, now_t, lo=self.index)
+        if due <= self.index:
+            if self.index == 0:
+                return None, None
+            # nothing new yet: repeat the current sample (like a live tracker)
+            i = self.index - 1
+        else:
+            self.skipped += due - self.index - 1
+            i = due - 1
+            self.index = due
+
+        self.lag_s = now_t - self.times[i]
+        self.max_lag_s = max(self.max_lag_s, self.lag_s)
+        return self._position(i), self.times[i]
+
+    def _position(self, i):
+        pos = self.data[i]
+        return (pos["x"], pos["y"], pos["z"])
+
+    def get_tracker_position(self):
+        return self.get_tracker_sample()[0]
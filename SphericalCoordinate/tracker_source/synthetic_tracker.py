@@ -0,0 +1,183 @@
+import time
+
+import numpy as np
+
+from tracker_source.abc_tracker import TrackerSource
+
+
+class SyntheticPedalTrackerSource(TrackerSource):
+    """Analytic pedal positions on a crank, generated in vectorized chunks.
+
+    The pedal moves on a circle of `radius` around `center` in the plane
+    with normal `normal`. Angle 0 is the top of the circle (highest world Y)
+    and increases the way `angle_deg_from_highest` measures it for a crank
+    in the YZ plane. `cadence` is rotations per second, either a constant or
+    a function of time (seconds, array in -> array out).
+
+    Every sample carries ground truth (time, angle, angular velocity);
+    dropouts return None, glitches return a wild position.
+    """
+
+    def __init__(
+        self,
+        radius=0.15,
+        center=(0.0, 0.9, 0.0),
+        normal=(1.0, 0.0, 0.0),
+        rate_hz=90.0,
+        cadence=1.0,
+        noise_std=0.0,
+        dropout_prob=0.0,
+        glitch_prob=0.0,
+        glitch_scale=0.5,
+        chunk_size=4096,
+        seed=0,
+    ):
+        self.radius = float(radius)
+        self.center = np.asarray(center, dtype=float)
+        self.dt = 1.0 / rate_hz
+        self.cadence = cadence
+        self.noise_std = noise_std
+        self.dropout_prob = dropout_prob
+        self.glitch_prob = glitch_prob
+        self.glitch_scale = glitch_scale
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+
+        self.u, self.w = self._plane_basis(normal)
+
+        self._next_index = 0
+        self._phase_deg = 0.0
+        self._chunk = None
+        self._pos_in_chunk = 0
+
+    @staticmethod
+    def _plane_basis(normal):
+        n = np.asarray(normal, dtype=float)
+        n = n / np.linalg.norm(n)
+        # u: world up projected into the plane (top dead center direction)
+        up = np.array([0.0, 1.0, 0.0])
+        u = up - np.dot(up, n) * n
+        if np.linalg.norm(u) < 1e-9:
+            u = np.array([1.0, 0.0, 0.0]) - n[0] * n
+        u /= np.linalg.norm(u)
+        return u, np.cross(n, u)
+
+    def _cadence_at(self, t):
+        if callable(self.cadence):
+            return np.asarray(self.cadence(t), dtype=float) * np.ones_like(t)
+        return np.full_like(t, float(self.cadence))
+
+    def generate(self, n):
+        """Next `n` samples as arrays.
+
+        Returns a dict with t (n,), pos (n, 3; NaN rows for dropouts),
+        angle_deg (n,), velocity_deg_s (n,), dropout (n,) and glitch (n,) masks.
+        """
+        t = (self._next_index + np.arange(n)) * self.dt
+        velocity = 360.0 * self._cadence_at(t)
+        # integrate the cadence profile; sample 0 of the chunk continues the previous one
+        phase = self._phase_deg + np.concatenate(([0.0], np.cumsum(velocity[:-1] * self.dt)))
+        self._phase_deg = phase[-1] + velocity[-1] * self.dt
+        self._next_index += n
+
+        angle = phase % 360.0
+        a = np.radians(angle)
+        pos = self.center + self.radius * (np.cos(a)[:, None] * self.u + np.sin(a)[:, None] * self.w)
+
+        if self.noise_std > 0:
+            pos += self.rng.normal(0.0, self.noise_std, pos.shape)
+
+        glitch = self.rng.random(n) < self.glitch_prob
+        if glitch.any():
+            pos[glitch] = self.center + self.rng.normal(0.0, self.glitch_scale, (int(glitch.sum()), 3))
+
+        dropout = self.rng.random(n) < self.dropout_prob
+        pos[dropout] = np.nan
+
+        return {
+            "t": t,
+            "pos": pos,
+            "angle_deg": angle,
+            "velocity_deg_s": velocity,
+            "dropout": dropout,
+            "glitch": glitch,
+        }
+
+    def get_sample(self):
+        """(pos or None, t, true angle_deg, true velocity_deg_s) of the next sample."""
+        if self._chunk is None or self._pos_in_chunk >= len(self._chunk["t"]):
+            chunk = self.generate(self.chunk_size)
+            # plain Python values: per-sample access stays cheap
+            self._chunk = {k: v.tolist() for k, v in chunk.items()}
+            self._pos_in_chunk = 0
+
+        c = self._chunk
+        i = self._pos_in_chunk
+        self._pos_in_chunk += 1
+        pos = None if c["dropout"][i] else tuple(c["pos"][i])
+        return pos, c["t"][i], c["angle_deg"][i], c["velocity_deg_s"][i]
+
+    def get_tracker_sample(self):
+        pos, t, _, _ = self.get_sample()
+        return pos, t
+
+    def get_tracker_position(self):
+        return self.get_sample()[0]
+
+
+def _benchmark(seconds=600.0, rate_hz=90.0):
+    from utils.polar_utils import (
+        best_fit_3d_circle, line_origin_to_highest_y,
+        angle_deg_from_highest
+    )
+
+    def cadence(t):
+        # 0.8..1.4 rps, slowly varying
+        return 1.1 + 0.3 * np.sin(2.0 * np.pi * t / 30.0)
+
+    src = SyntheticPedalTrackerSource(rate_hz=rate_hz, cadence=cadence, noise_std=0.002, dropout_prob=0.01, glitch_prob=0.001)
+
+    n = int(seconds * rate_hz)
+    start = time.perf_counter()
+    data = src.generate(n)
+    gen_s = time.perf_counter() - start
+    print(f"generate: {n} samples ({seconds:.0f}s of data) in {gen_s * 1000:.1f} ms ({n / gen_s / 1e6:.1f} M samples/s)")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        src.get_tracker_position()
+    per_call = (time.perf_counter() - start) / 10000
+    print(f"get_tracker_position: {per_call * 1e6:.2f} us/call")
+
+    clean = ~(data["dropout"] | data["glitch"])
+    pos = data["pos"][clean]
+    truth = data["angle_deg"][clean]
+    t = data["t"][clean]
+
+    # calibrate on the first 100 clean samples, as TrackerUdpBroadcaster does
+    calib = pos[:100].tolist()
+    start = time.perf_counter()
+    center, normal, radius = best_fit_3d_circle(calib)
+    fit_ms = (time.perf_counter() - start) * 1000
+    print(
+        f"best_fit_3d_circle: {fit_ms:.2f} ms, center err={np.linalg.norm(np.subtract(center, src.center)) * 1000:.2f} mm, "
+        f"radius err={abs(radius - src.radius) * 1000:.2f} mm, normal dot={abs(np.dot(normal, np.cross(src.u, src.w))):.5f}"
+    )
+
+    origin, highest = line_origin_to_highest_y(calib, center)
+    start = time.perf_counter()
+    est = np.array([angle_deg_from_highest(origin, highest, p) for p in pos.tolist()])
+    ang_us = (time.perf_counter() - start) / len(est) * 1e6
+    err = (est - truth + 180.0) % 360.0 - 180.0
+    print(f"angle_deg_from_highest: {ang_us:.2f} us/sample, err mean={err.mean():.3f} deg rms={np.sqrt(np.mean(err ** 2)):.3f} deg")
+
+    # consecutive-sample velocity, the estimate send_degree_position makes
+    d_angle = (np.diff(est) + 180.0) % 360.0 - 180.0
+    vel = d_angle / np.diff(t)
+    vel_err = vel - data["velocity_deg_s"][clean][1:]
+    print(f"velocity (consecutive diff): err rms={np.sqrt(np.mean(vel_err ** 2)):.1f} deg/s")
+
+
+if __name__ == "__main__":
+    # run from SphericalCoordinate/: python -m tracker_source.synthetic_tracker
+    _benchmark()
@@ -9,4 +9,7 @@ class ViveTrackers:
             self.source.shutdown()
 
     def get_tracker_position(self):
-        return self.source.get_tracker_position()
\ No newline at end of file
+        return self.source.get_tracker_position()
+
+    def get_tracker_sample(self):
+        return self.source.get_tracker_sample()
\ No newline at end of file
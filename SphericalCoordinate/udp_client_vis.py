@@ -1,15 +1,27 @@
+import argparse
 import json
 import math
+import os
 import socket
 import threading
 import time
 
+import numpy as np
 import pygame
 
+from models.shm_ring import DEFAULT_NAME, KIND_ANGLE, KIND_CIRCLE, KIND_REFLINE, KIND_XYZ, ShmRingReader
+
 
 UDP_IP = "127.0.0.1"
 UDP_PORT = 9000
 SOCKET_TIMEOUT_S = 0.1
+RECV_BUFFER_BYTES = 1 << 20
+RECV_BATCH_MAX = 1024
+# print circle/ref line packets from the receive thread (debugging only)
+VERBOSE = False
+SHM_POLL_S = 0.002
+# reattach when the ring is silent this long (the tracker may have restarted)
+SHM_STALE_S = 2.0
 
 WINDOW_W = 900
 WINDOW_H = 700
@@ -23,93 +35,305 @@ WORLD_SCALE = 300
 FOV = 3.0
 Z_CLIP = -2.5
 ROTATE_SPEED = 0.008
-MAX_POINTS = 10
+TRAIL_LEN = 500
+MAX_CIRCLES = 8
+# Circles whose center/normal/radius agree to this many decimals are the same fit.
+CIRCLE_KEY_DECIMALS = 4
 CIRCLE_SEGMENTS = 64
 
-positions = []
+class PositionRing:
+    """Fixed-capacity (N, 3) position trail; the oldest samples are overwritten."""
+
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self._buf = np.empty((self.capacity, 3))
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, pos):
+        self._buf[self._head] = pos
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def extend(self, pts):
+        pts = np.asarray(pts, dtype=float).reshape(-1, 3)[-self.capacity:]
+        n = len(pts)
+        first = min(n, self.capacity - self._head)
+        self._buf[self._head:self._head + first] = pts[:first]
+        self._buf[:n - first] = pts[first:]
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def snapshot(self):
+        """Copy of the trail ordered oldest -> newest."""
+        if self._count < self.capacity:
+            return self._buf[:self._count].copy()
+        return np.concatenate((self._buf[self._head:], self._buf[:self._head]))
+
+
+class CircleStore:
+    """Bounded, deduplicated set of circles keyed by fit identity.
+
+    Re-sending the same fit (e.g. repeated `sc` commands) does not add a
+    circle; beyond MAX_CIRCLES the least recently received one is dropped.
+    """
+
+    def __init__(self, capacity=MAX_CIRCLES):
+        self.capacity = capacity
+        self._circles = {}
+        self.version = 0
+
+    @staticmethod
+    def _key(center, normal, radius):
+        return tuple(round(v, CIRCLE_KEY_DECIMALS) for v in (*center, *normal, radius))
+
+    def add(self, center, normal, radius):
+        key = self._key(center, normal, radius)
+        if key in self._circles:
+            # refresh recency only; geometry is unchanged
+            self._circles[key] = self._circles.pop(key)
+            return False
+        self._circles[key] = (center, normal, radius)
+        if len(self._circles) > self.capacity:
+            del self._circles[next(iter(self._circles))]
+        self.version += 1
+        return True
+
+    def values(self):
+        return list(self._circles.values())
+
+
+positions = PositionRing(TRAIL_LEN)
 latest_ts = 0.0
-circle_data = []
+circle_data = CircleStore()
 yline_data = None
 degree_data = None
 lock = threading.Lock()
 
 
-def recv_loop():
-    global circle_data, yline_data, degree_data, latest_ts
+class RecvStats:
+    """Receive-side counters shown in the overlay.
+
+    All of them are counted here, after the kernel: datagrams the kernel
+    dropped on a full socket buffer are never seen and are not counted.
+    `invalid` is datagrams that did not decode to a known packet, `coalesced`
+    angle packets superseded by a newer one in the same batch, `batch` the
+    size of the last batch drained, and `lost` shared-memory records the
+    ring overwrote before they were read (--shm only).
+    """
+
+    def __init__(self):
+        self.packets = 0
+        self.invalid = 0
+        self.coalesced = 0
+        self.batch = 0
+        self.lost = 0
+        self.rate = 0.0
+        self._window_start = time.perf_counter()
+        self._window_packets = 0
+
+    def add_batch(self, received, invalid, coalesced, lost=0):
+        self.packets += received
+        self.invalid += invalid
+        self.coalesced += coalesced
+        self.lost += lost
+        self.batch = received
+        self._window_packets += received
+        now = time.perf_counter()
+        if now - self._window_start >= 1.0:
+            self.rate = self._window_packets / (now - self._window_start)
+            self._window_start = now
+            self._window_packets = 0
+
+    def label(self):
+        return (
+            f"rx={self.rate:.0f}/s last_batch={self.batch} "
+            f"invalid={self.invalid} coalesced={self.coalesced} shm_lost={self.lost}"
+        )
+
+
+recv_stats = RecvStats()
+
+
+def _vec3(v):
+    return (float(v[0]), float(v[1]), float(v[2]))
+
+
+def _is_degree(data):
+    return b'"angle_deg"' in data and b'"type"' not in data
+
+
+def drain_socket(sock, first):
+    """Return `first` plus every datagram already queued on `sock`."""
+    batch = [first]
+    sock.setblocking(False)
+    try:
+        while len(batch) < RECV_BATCH_MAX:
+            batch.append(sock.recv(4096))
+    except (BlockingIOError, InterruptedError):
+        pass
+    finally:
+        sock.settimeout(SOCKET_TIMEOUT_S)
+    return batch
+
+
+def decode_batch(batch):
+    """Decode one batch of datagrams, keeping only what the display needs.
+
+    Only the newest degree sample is decoded; older ones in the batch are
+    counted as coalesced. Positions and geometry updates are all kept.
+    """
+    degree = None
+    pts = []
+    circles = []
+    yline = None
+    latest = None
+    invalid = 0
+    coalesced = 0
+
+    newest_degree = None
+    for i in range(len(batch) - 1, -1, -1):
+        if _is_degree(batch[i]):
+            newest_degree = i
+            break
+
+    for i, data in enumerate(batch):
+        if _is_degree(data) and i != newest_degree:
+            coalesced += 1
+            continue
+        try:
+            msg = json.loads(data.decode("utf-8"))
+            if not isinstance(msg, dict):
+                invalid += 1
+                continue
+            ts = float(msg.get("ts", time.time()))
+            if "angle_deg" in msg and "angular_velocity" in msg:
+                degree = (float(msg["angle_deg"]), float(msg["angular_velocity"]), ts)
+                continue
+
+            msg_type = msg.get("type", "pos")
+            if msg_type == "circle":
+                center, normal = msg["center"], msg["normal"]
+                circles.append((_vec3(center), _vec3(normal), float(msg["radius"])))
+                if VERBOSE:
+                    print(f"recv circle: r={float(msg['radius']):.6f} age={time.time() - ts:.2f}s")
+            elif msg_type == "refline":
+                yline = (_vec3(msg["origin"]), _vec3(msg["highest"]))
+                if VERBOSE:
+                    print(f"recv yline: age={time.time() - ts:.2f}s")
+            else:
+                pts.append(_vec3((msg["x"], msg["y"], msg["z"])))
+                latest = ts
+        except (ValueError, KeyError, TypeError, IndexError, UnicodeDecodeError):
+            invalid += 1
+
+    return degree, pts, circles, yline, latest, invalid, coalesced
+
+
+def decode_records(records):
+    """Same result as decode_batch() for a shared-memory record array."""
+    kind, data, ts = records["kind"], records["data"], records["ts"]
+
+    xyz = kind == KIND_XYZ
+    pts = data[xyz, :3]
+    latest = float(ts[xyz][-1]) if len(pts) else None
+
+    degree = None
+    coalesced = 0
+    angles = np.flatnonzero(kind == KIND_ANGLE)
+    if len(angles):
+        i = angles[-1]
+        degree = (float(data[i, 0]), float(data[i, 1]), float(ts[i]))
+        coalesced = len(angles) - 1
+
+    circles = []
+    for d, t in zip(data[kind == KIND_CIRCLE], ts[kind == KIND_CIRCLE]):
+        circles.append((_vec3(d[:3]), _vec3(d[3:6]), float(d[6])))
+        if VERBOSE:
+            print(f"recv circle: r={float(d[6]):.6f} age={time.time() - t:.2f}s")
+
+    yline = None
+    reflines = np.flatnonzero(kind == KIND_REFLINE)
+    if len(reflines):
+        i = reflines[-1]
+        yline = (_vec3(data[i, :3]), _vec3(data[i, 3:6]))
+        if VERBOSE:
+            print(f"recv yline: age={time.time() - ts[i]:.2f}s")
+
+    return degree, pts, circles, yline, latest, 0, coalesced
+
+
+def apply_batch(batch):
+    apply_decoded(decode_batch(batch), len(batch))
+
+
+def apply_decoded(decoded, received, lost=0):
+    global yline_data, degree_data, latest_ts
+    degree, pts, circles, yline, latest, invalid, coalesced = decoded
+
+    # one lock acquisition per batch
+    with lock:
+        if degree is not None:
+            degree_data = degree
+        if len(pts):
+            positions.extend(pts)
+            latest_ts = latest
+        for circle in circles:
+            circle_data.add(*circle)
+        if yline is not None:
+            yline_data = yline
+        recv_stats.add_batch(received, invalid, coalesced, lost)
+
+
+def recv_loop(record_path=None):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_BYTES)
+    except OSError:
+        pass
     sock.bind((UDP_IP, UDP_PORT))
     sock.settimeout(SOCKET_TIMEOUT_S)
+    # packet log: one raw datagram (single-line JSON) per line
+    record = open(record_path, "ab") if record_path else None
     while True:
         try:
-            data, _addr = sock.recvfrom(4096)
+            data = sock.recv(4096)
         except socket.timeout:
             continue
-        try:
-            msg = json.loads(data.decode("utf-8"))
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            continue
-        ts = float(msg.get("ts", time.time()))
-        age = time.time() - ts
-        if "angle_deg" in msg and "angular_velocity" in msg:
-            with lock:
-                degree_data = (
-                    float(msg["angle_deg"]),
-                    float(msg["angular_velocity"]),
-                    ts,
-                )
-            print(
-                f"recv degree: angle={msg['angle_deg']:.3f} "
-                f"vel={msg['angular_velocity']:.3f} age={age:.2f}s"
-            )
-            continue
+        batch = drain_socket(sock, data)
+        if record is not None:
+            record.write(b"\n".join(batch) + b"\n")
+            record.flush()
+        apply_batch(batch)
 
-        msg_type = msg.get("type", "pos")
-        if msg_type == "circle":
-            if not all(k in msg for k in ("center", "normal", "radius")):
-                continue
-            center = msg["center"]
-            normal = msg["normal"]
-            radius = msg["radius"]
-            if len(center) < 3 or len(normal) < 3:
-                continue
-            with lock:
-                circle_data.append(
-                    (
-                        (float(center[0]), float(center[1]), float(center[2])),
-                        (float(normal[0]), float(normal[1]), float(normal[2])),
-                        float(radius),
-                    )
-                )
-            print(
-                f"recv circle: r={float(radius):.6f} age={age:.2f}s"
-            )
-            continue
-        if msg_type == "refline":
-            if not all(k in msg for k in ("origin", "highest")):
-                continue
-            origin = msg["origin"]
-            highest = msg["highest"]
-            if len(origin) < 3 or len(highest) < 3:
+
+def shm_loop(name):
+    """Same-host alternative to recv_loop: poll the tracker's shared-memory ring."""
+    reader = None
+    last_data = time.perf_counter()
+    while True:
+        now = time.perf_counter()
+        if reader is not None and (not reader.writer_open or now - last_data > SHM_STALE_S):
+            reader.close()
+            reader = None
+        if reader is None:
+            try:
+                reader = ShmRingReader(name)
+            except (FileNotFoundError, ValueError):
+                time.sleep(SOCKET_TIMEOUT_S)
                 continue
-            with lock:
-                yline_data = (
-                    (float(origin[0]), float(origin[1]), float(origin[2])),
-                    (float(highest[0]), float(highest[1]), float(highest[2])),
-                )
-            print(f"recv yline: age={age:.2f}s")
-            continue
-        if not all(k in msg for k in ("x", "y", "z")):
+            last_data = now
+
+        lost = reader.lost
+        records = reader.read_new()
+        if not len(records):
+            time.sleep(SHM_POLL_S)
             continue
-        pos = (float(msg["x"]), float(msg["y"]), float(msg["z"]))
-        with lock:
-            positions.append(pos)
-            if len(positions) > MAX_POINTS:
-                del positions[: len(positions) - MAX_POINTS]
-            latest_ts = ts
-        print(
-            f"recv pos: x={pos[0]:.6f} y={pos[1]:.6f} "
-            f"z={pos[2]:.6f} age={age:.2f}s"
-        )
+        last_data = now
+        apply_decoded(decode_records(records), len(records), reader.lost - lost)
 
 
 def rotate_point(x, y, z, yaw, pitch):
@@ -135,18 +359,41 @@ def project_point(x, y, z, cx, cy):
     return int(sx), int(sy), depth
 
 
-def draw_axes(screen, cx, cy, yaw, pitch):
-    axis_len = 1.5
-    for axis in ("x", "y", "z"):
-        if axis == "x":
-            x, y, z = axis_len, 0.0, 0.0
-        elif axis == "y":
-            x, y, z = 0.0, axis_len, 0.0
-        else:
-            x, y, z = 0.0, 0.0, axis_len
-        rx, ry, rz = rotate_point(x, y, z, yaw, pitch)
-        sx, sy, _ = project_point(rx, ry, rz, cx, cy)
-        pygame.draw.line(screen, AXIS_COLOR, (cx, cy), (sx, sy), 2)
+def view_matrix(yaw, pitch):
+    # Same transform as rotate_point, as a matrix: rotated = points @ view.T
+    cos_y = math.cos(yaw)
+    sin_y = math.sin(yaw)
+    cos_p = math.cos(pitch)
+    sin_p = math.sin(pitch)
+    return np.array([
+        [cos_y, 0.0, sin_y],
+        [sin_y * sin_p, cos_p, -cos_y * sin_p],
+        [-sin_y * cos_p, sin_p, cos_y * cos_p],
+    ])
+
+
+def project_points(points, view, cx, cy):
+    """Rotate and project (N, 3) world points in one matrix multiply.
+
+    Returns integer screen coordinates (N, 2) and depth (N,).
+    """
+    rotated = points @ view.T
+    depth = FOV / (FOV + np.maximum(rotated[:, 2], Z_CLIP))
+    screen = np.empty((len(points), 2), dtype=np.int64)
+    screen[:, 0] = cx + rotated[:, 0] * WORLD_SCALE * depth
+    screen[:, 1] = cy - rotated[:, 1] * WORLD_SCALE * depth
+    return screen, depth
+
+
+AXES_WORLD = np.array([
+    [1.5, 0.0, 0.0],
+    [0.0, 1.5, 0.0],
+    [0.0, 0.0, 1.5],
+])
+
+_CIRCLE_T = np.linspace(0.0, 2.0 * math.pi, CIRCLE_SEGMENTS + 1)
+_CIRCLE_COS = np.cos(_CIRCLE_T)
+_CIRCLE_SIN = np.sin(_CIRCLE_T)
 
 
 def _normalize(vec):
@@ -164,32 +411,79 @@ def _cross(a, b):
     )
 
 
-def _lerp_color(a, b, t):
-    t = max(0.0, min(1.0, t))
+def circle_polyline(center, normal, radius):
+    """World-space polyline (CIRCLE_SEGMENTS + 1, 3) of a 3D circle."""
+    n = _normalize(normal)
+    # Pick a reference vector not parallel to n.
+    ref = (0.0, 1.0, 0.0) if abs(n[1]) < 0.9 else (1.0, 0.0, 0.0)
+    u = np.asarray(_normalize(_cross(n, ref)))
+    v = np.asarray(_cross(n, u))
     return (
-        int(a[0] + (b[0] - a[0]) * t),
-        int(a[1] + (b[1] - a[1]) * t),
-        int(a[2] + (b[2] - a[2]) * t),
+        np.asarray(center)
+        + radius * (_CIRCLE_COS[:, None] * u + _CIRCLE_SIN[:, None] * v)
     )
 
 
-def draw_circle(screen, center, normal, radius, yaw, pitch, cx, cy):
-    n = _normalize(normal)
-    # Pick a reference vector not parallel to n.
-    ref = (0.0, 1.0, 0.0) if abs(n[1]) < 0.9 else (1.0, 0.0, 0.0)
-    u = _normalize(_cross(n, ref))
-    v = _cross(n, u)
-    points = []
-    for i in range(CIRCLE_SEGMENTS + 1):
-        angle = 2.0 * math.pi * i / CIRCLE_SEGMENTS
-        x = center[0] + radius * (u[0] * math.cos(angle) + v[0] * math.sin(angle))
-        y = center[1] + radius * (u[1] * math.cos(angle) + v[1] * math.sin(angle))
-        z = center[2] + radius * (u[2] * math.cos(angle) + v[2] * math.sin(angle))
-        rx, ry, rz = rotate_point(x, y, z, yaw, pitch)
-        sx, sy, _ = project_point(rx, ry, rz, cx, cy)
-        points.append((sx, sy))
-    if len(points) > 1:
-        pygame.draw.lines(screen, (255, 160, 80), False, points, 2)
+class SceneCache:
+    """Keeps the static geometry projected until the view or circles change."""
+
+    def __init__(self):
+        self._circles_version = None
+        self._circles_world = np.empty((0, 3))
+        self._view_key = None
+        self._circle_lines = []
+        self._axes = []
+
+    def update(self, circles, version, yaw, pitch, cx, cy):
+        if version != self._circles_version:
+            # one stacked array holding every circle's polyline
+            polylines = [circle_polyline(*circle) for circle in circles]
+            self._circles_world = (
+                np.concatenate(polylines) if polylines else np.empty((0, 3))
+            )
+            self._circles_version = version
+            self._view_key = None
+
+        view_key = (yaw, pitch, cx, cy)
+        if view_key == self._view_key:
+            return
+        self._view_key = view_key
+
+        view = view_matrix(yaw, pitch)
+        world = np.concatenate([AXES_WORLD, self._circles_world])
+        screen, _ = project_points(world, view, cx, cy)
+        self._axes = [tuple(p) for p in screen[:3].tolist()]
+        stride = CIRCLE_SEGMENTS + 1
+        lines = screen[3:].tolist()
+        self._circle_lines = [
+            lines[i:i + stride] for i in range(0, len(lines), stride)
+        ]
+
+    def draw(self, screen, cx, cy):
+        for end in self._axes:
+            pygame.draw.line(screen, AXIS_COLOR, (cx, cy), end, 2)
+        for points in self._circle_lines:
+            pygame.draw.lines(screen, (255, 160, 80), False, points, 2)
+
+
+def draw_points(screen, pts, view, cx, cy):
+    pts = np.asarray(pts, dtype=float)
+    proj, depth = project_points(pts, view, cx, cy)
+
+    # Oldest -> newest color ramp.
+    t = np.linspace(0.0, 1.0, len(pts)) if len(pts) > 1 else np.ones(1)
+    oldest = np.asarray(POINT_OLDEST_COLOR, dtype=float)
+    newest = np.asarray(POINT_NEWEST_COLOR, dtype=float)
+    colors = (oldest + (newest - oldest) * t[:, None]).astype(int)
+    sizes = np.maximum(2, (3 * depth).astype(int))
+
+    # Draw far-to-near so closer points appear on top.
+    order = np.argsort(depth, kind="stable")
+    proj = proj[order].tolist()
+    colors = colors[order].tolist()
+    sizes = sizes[order].tolist()
+    for (sx, sy), color, size in zip(proj, colors, sizes):
+        pygame.draw.circle(screen, color, (sx, sy), size)
 
 
 def draw_yline(screen, origin, highest, yaw, pitch, cx, cy):
@@ -200,8 +494,145 @@ def draw_yline(screen, origin, highest, yaw, pitch, cx, cy):
     pygame.draw.line(screen, (255, 220, 120), (osx, osy), (hsx, hsy), 2)
 
 
+def snapshot_state():
+    with lock:
+        return {
+            "pts": positions.snapshot(),
+            "latest_ts": latest_ts,
+            "circles": circle_data.values(),
+            "circles_version": circle_data.version,
+            "yline": yline_data,
+            "degree": degree_data,
+            "stats_label": recv_stats.label(),
+        }
+
+
+def render_frame(screen, font, scene, state, yaw, pitch, now):
+    screen.fill(BG_COLOR)
+    cx, cy = screen.get_width() // 2, screen.get_height() // 2
+
+    pts = state["pts"]
+    age = now - state["latest_ts"] if state["latest_ts"] else 0.0
+
+    scene.update(state["circles"], state["circles_version"], yaw, pitch, cx, cy)
+    scene.draw(screen, cx, cy)
+
+    if len(pts):
+        draw_points(screen, pts, view_matrix(yaw, pitch), cx, cy)
+
+    if state["yline"] is not None:
+        origin, highest = state["yline"]
+        draw_yline(screen, origin, highest, yaw, pitch, cx, cy)
+
+    label = f"points={len(pts)} age={age:.2f}s"
+    screen.blit(font.render(label, True, TEXT_COLOR), (12, 12))
+    if state["degree"] is not None:
+        angle_deg, angular_velocity, ts = state["degree"]
+        deg_age = now - ts
+        deg_label = (
+            f"angle={angle_deg:.2f} deg vel={angular_velocity:.2f} "
+            f"deg/s age={deg_age:.2f}s"
+        )
+        screen.blit(font.render(deg_label, True, TEXT_COLOR), (12, 32))
+    screen.blit(font.render(state["stats_label"], True, TEXT_COLOR), (12, 52))
+
+
+def load_recording(path):
+    """Datagrams from a packet log (.jsonl, see --record) or a position recording (.json).
+
+    Position recordings ({"duration_sec", "count", "samples": [{"pos": ...}]})
+    become position packets with timestamps spread over `duration_sec`.
+    """
+    if path.endswith(".jsonl"):
+        with open(path, "rb") as f:
+            return [line.strip() for line in f if line.strip()]
+
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    samples = raw.get("samples", []) if isinstance(raw, dict) else raw
+    duration = raw.get("duration_sec") if isinstance(raw, dict) else None
+    dt = duration / max(1, len(samples)) if duration else 0.0
+
+    packets = []
+    for i, item in enumerate(samples):
+        pos = item.get("pos") if isinstance(item, dict) else item
+        if not pos or len(pos) < 3:
+            continue
+        packets.append(json.dumps({"x": pos[0], "y": pos[1], "z": pos[2], "ts": i * dt}).encode("utf-8"))
+    return packets
+
+
+def run_headless(path, out_dir=None, summary=None, every=1, yaw=0.0, pitch=0.0):
+    """Render a recording offscreen as fast as possible (no wall-clock pacing)."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.Surface((WINDOW_W, WINDOW_H))
+    font = pygame.font.SysFont("monospace", 16)
+    scene = SceneCache()
+
+    packets = load_recording(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    frames = 0
+    every = max(1, every)
+    for i in range(0, len(packets), every):
+        apply_batch(packets[i:i + every])
+        if out_dir:
+            state = snapshot_state()
+            render_frame(screen, font, scene, state, yaw, pitch, state["latest_ts"])
+            pygame.image.save(screen, os.path.join(out_dir, f"frame_{frames:06d}.png"))
+            frames += 1
+
+    if summary:
+        state = snapshot_state()
+        render_frame(screen, font, scene, state, yaw, pitch, state["latest_ts"])
+        pygame.image.save(screen, summary)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"rendered {len(packets)} packets, {frames} frames in {elapsed:.2f}s"
+        + (f" ({frames / elapsed:.0f} frames/s)" if frames and elapsed > 0 else "")
+    )
+    pygame.quit()
+
+
 def main():
-    thread = threading.Thread(target=recv_loop, daemon=True)
+    global positions, VERBOSE
+    parser = argparse.ArgumentParser(description="UDP tracker position monitor")
+    parser.add_argument("--trail", type=int, default=None, help=f"Number of positions kept in the trail (default {TRAIL_LEN}; whole recording for --summary)")
+    parser.add_argument("--record", help="Append every received datagram to this packet log (.jsonl)")
+    parser.add_argument("--shm", nargs="?", const=DEFAULT_NAME, help=f"Read the tracker's shared-memory ring instead of UDP (same PC only; default name {DEFAULT_NAME})")
+    parser.add_argument("--headless", metavar="RECORDING", help="Render a packet log (.jsonl) or position recording (.json) offscreen")
+    parser.add_argument("--out", help="Headless: directory for the PNG frame sequence")
+    parser.add_argument("--summary", help="Headless: write one PNG of the final state")
+    parser.add_argument("--every", type=int, default=1, help="Headless: packets per rendered frame (default 1)")
+    parser.add_argument("--yaw", type=float, default=0.0, help="Headless: view yaw (radians)")
+    parser.add_argument("--pitch", type=float, default=0.0, help="Headless: view pitch (radians)")
+    parser.add_argument("--verbose", action="store_true", help="Print circle/ref line packets as they arrive")
+    args = parser.parse_args()
+    VERBOSE = args.verbose
+
+    trail = args.trail
+    if trail is None:
+        trail = TRAIL_LEN
+        if args.headless and args.summary and not args.out:
+            trail = max(TRAIL_LEN, len(load_recording(args.headless)))
+    positions = PositionRing(trail)
+
+    if args.headless:
+        if not args.out and not args.summary:
+            parser.error("--headless needs --out and/or --summary")
+        run_headless(args.headless, args.out, args.summary, args.every, args.yaw, args.pitch)
+        return
+
+    if args.shm:
+        if args.record:
+            parser.error("--record logs UDP datagrams and cannot be used with --shm")
+        thread = threading.Thread(target=shm_loop, args=(args.shm,), daemon=True)
+    else:
+        thread = threading.Thread(target=recv_loop, args=(args.record,), daemon=True)
     thread.start()
 
     pygame.init()
@@ -215,6 +646,8 @@ def main():
     dragging = False
     last_mouse = (0, 0)
 
+    scene = SceneCache()
+
     running = True
     while running:
         for event in pygame.event.get():
@@ -233,51 +666,7 @@ def main():
                 pitch = max(-1.4, min(1.4, pitch))
                 last_mouse = event.pos
 
-        screen.fill(BG_COLOR)
-        cx, cy = WINDOW_W // 2, WINDOW_H // 2
-        draw_axes(screen, cx, cy, yaw, pitch)
-
-        with lock:
-            pts = list(positions)[-MAX_POINTS:]
-            age = time.time() - latest_ts if latest_ts else 0.0
-            circles = list(circle_data)
-            yline = yline_data
-            degree = degree_data
-
-        if pts:
-            denom = max(1, len(pts) - 1)
-            projected = []
-            for i, (x, y, z) in enumerate(pts):
-                rx, ry, rz = rotate_point(x, y, z, yaw, pitch)
-                sx, sy, depth = project_point(rx, ry, rz, cx, cy)
-                t = i / denom
-                color = _lerp_color(POINT_OLDEST_COLOR, POINT_NEWEST_COLOR, t)
-                projected.append((depth, sx, sy, color))
-
-            # Draw far-to-near so closer points appear on top.
-            projected.sort(key=lambda item: item[0])
-            for depth, sx, sy, color in projected:
-                size = max(2, int(3 * depth))
-                pygame.draw.circle(screen, color, (sx, sy), size)
-
-        for circle in circles:
-            center, normal, radius = circle
-            draw_circle(screen, center, normal, radius, yaw, pitch, cx, cy)
-
-        if yline is not None:
-            origin, highest = yline
-            draw_yline(screen, origin, highest, yaw, pitch, cx, cy)
-
-        label = f"points={len(pts)} age={age:.2f}s"
-        screen.blit(font.render(label, True, TEXT_COLOR), (12, 12))
-        if degree is not None:
-            angle_deg, angular_velocity, ts = degree
-            deg_age = time.time() - ts
-            deg_label = (
-                f"angle={angle_deg:.2f} deg vel={angular_velocity:.2f} "
-                f"deg/s age={deg_age:.2f}s"
-            )
-            screen.blit(font.render(deg_label, True, TEXT_COLOR), (12, 32))
+        render_frame(screen, font, scene, snapshot_state(), yaw, pitch, time.time())
 
         pygame.display.flip()
         clock.tick(60)
@@ -0,0 +1,96 @@
+class AdaptiveRate:
+    """Decides which angle packets to send: full rate while moving, a
+    heartbeat while the rider is idle.
+
+    The rider counts as moving when |angular velocity| exceeds
+    `velocity_threshold` (deg/s), |rudder| exceeds `rudder_threshold` (deg),
+    or the angle has moved more than `angle_threshold` (deg) since the last
+    packet sent. The first such sample is sent at once. Idle needs all three
+    below half their thresholds for `idle_after_s` seconds (hysteresis), so
+    a slow pedal stroke does not flap between the two rates.
+
+    Moving, packets go out at up to `max_hz`; idle, at `min_hz`.
+    """
+
+    def __init__(self, min_hz=1.0, max_hz=90.0, velocity_threshold=10.0, rudder_threshold=1.0,
+                 angle_threshold=2.0, idle_after_s=1.0):
+        self.min_dt = 1.0 / min_hz
+        self.max_dt = 1.0 / max_hz
+        self.velocity_threshold = velocity_threshold
+        self.rudder_threshold = rudder_threshold
+        self.angle_threshold = angle_threshold
+        self.idle_after_s = idle_after_s
+
+        self.idle = False
+        self.sent = 0
+        self.skipped = 0
+        self._last_sent_t = None
+        self._last_sent_angle = None
+        self._last_motion_t = None
+
+    def _motion(self, angle_deg, velocity, rudder, scale):
+        if abs(velocity) > self.velocity_threshold * scale:
+            return True
+        if abs(rudder) > self.rudder_threshold * scale:
+            return True
+        if self._last_sent_angle is not None:
+            moved = abs((angle_deg - self._last_sent_angle + 180.0) % 360.0 - 180.0)
+            if moved > self.angle_threshold * scale:
+                return True
+        return False
+
+    def should_send(self, now, angle_deg, velocity, rudder=0.0):
+        if self._last_sent_t is None:
+            self._last_motion_t = now
+            return self._send(now, angle_deg)
+
+        if self.idle:
+            if self._motion(angle_deg, velocity, rudder, 1.0):
+                # wake up: this sample goes out immediately
+                self.idle = False
+                self._last_motion_t = now
+                return self._send(now, angle_deg)
+        else:
+            if self._motion(angle_deg, velocity, rudder, 0.5):
+                self._last_motion_t = now
+            elif now - self._last_motion_t >= self.idle_after_s:
+                self.idle = True
+
+        min_gap = self.min_dt if self.idle else self.max_dt
+        # small tolerance so a poll scheduled exactly at the rate is not skipped
+        if now - self._last_sent_t >= min_gap * 0.999:
+            return self._send(now, angle_deg)
+        self.skipped += 1
+        return False
+
+    def _send(self, now, angle_deg):
+        self._last_sent_t = now
+        self._last_sent_angle = angle_deg
+        self.sent += 1
+        return True
+
+
+def _check(rate_hz=90.0):
+    ar = AdaptiveRate(min_hz=1.0, max_hz=rate_hz)
+    dt = 1.0 / rate_hz
+    sent = []
+    angle = 0.0
+    # 2 s pedaling, 5 s still (with jitter), then pedaling again
+    for i in range(int(10.0 * rate_hz)):
+        t = i * dt
+        moving = t < 2.0 or t >= 7.0
+        velocity = 90.0 if moving else 0.5
+        angle = (angle + velocity * dt) % 360.0
+        if ar.should_send(t, angle, velocity):
+            sent.append((t, ar.idle))
+
+    still = [t for t, _ in sent if 2.0 <= t < 7.0]
+    wake = next(t for t, _ in sent if t >= 7.0)
+    print(f"sent {ar.sent} skipped {ar.skipped}; {len(still)} packets while still, woke at {wake:.3f}s")
+    assert len(still) <= int(ar.idle_after_s * rate_hz) + 6
+    assert wake - 7.0 < dt
+
+
+if __name__ == "__main__":
+    # run from SphericalCoordinate/: python -m utils.adaptive_rate
+    _check()
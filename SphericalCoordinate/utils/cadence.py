@@ -0,0 +1,242 @@
+import math
+
+import numpy as np
+
+MIN_CADENCE_HZ = 0.2
+MAX_CADENCE_HZ = 3.0
+PROFILE_BINS = 36
+
+
+# ================= HELPERS =================
+
+def unwrap_deg(angle_deg):
+    return np.degrees(np.unwrap(np.radians(np.asarray(angle_deg, dtype=float))))
+
+
+def resample_uniform(t, angle_deg, rate_hz):
+    """(grid, unwrapped phase in deg) on a uniform `rate_hz` grid."""
+    t = np.asarray(t, dtype=float)
+    phase = unwrap_deg(angle_deg)
+    grid = np.arange(t[0], t[-1], 1.0 / rate_hz)
+    return grid, np.interp(grid, t, phase)
+
+
+def _peak_offset(left, center, right):
+    """Parabolic interpolation of a peak on log magnitudes, in bins (-0.5..0.5)."""
+    a = np.log(np.maximum(left, 1e-300))
+    b = np.log(np.maximum(center, 1e-300))
+    c = np.log(np.maximum(right, 1e-300))
+    denom = a - 2.0 * b + c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = np.where(denom < 0.0, 0.5 * (a - c) / denom, 0.0)
+    return np.clip(offset, -0.5, 0.5)
+
+
+# ================= OFFLINE (whole recording, one array pass) =================
+
+def cadence_frames(phase_deg, rate_hz, window_s=4.0, hop_s=0.5):
+    """Cadence of every window of a uniformly sampled phase.
+
+    The crank is turned into the complex signal exp(i * phase), so a steady
+    cadence is a single spectral line whose sign is the pedaling direction.
+    All frames are Hann-windowed and transformed in one batched FFT.
+
+    Returns frame center indices and signed cadence in Hz.
+    """
+    x = np.exp(1j * np.radians(np.asarray(phase_deg, dtype=float)))
+    n = int(round(window_s * rate_hz))
+    hop = max(1, int(round(hop_s * rate_hz)))
+    if len(x) < n:
+        return np.empty(0, dtype=int), np.empty(0)
+
+    frames = np.lib.stride_tricks.sliding_window_view(x, n)[::hop] * np.hanning(n)
+    mag = np.abs(np.fft.fft(frames, axis=1))
+    freqs = np.fft.fftfreq(n, 1.0 / rate_hz)
+    band = (np.abs(freqs) >= MIN_CADENCE_HZ) & (np.abs(freqs) <= MAX_CADENCE_HZ)
+    mag[:, ~band] = 0.0
+
+    rows = np.arange(len(mag))
+    k = np.argmax(mag, axis=1)
+    offset = _peak_offset(mag[rows, (k - 1) % n], mag[rows, k], mag[rows, (k + 1) % n])
+    cadence_hz = (freqs[k] + offset * rate_hz / n)
+    centers = np.arange(len(mag)) * hop + n // 2
+    return centers, cadence_hz
+
+
+def stroke_metrics(phase_deg, rate_hz):
+    """Smoothness and dead spot of a uniformly sampled phase.
+
+    smoothness is 1 - (std / mean) of the angular velocity (1.0 is a
+    perfectly even stroke). The dead spot is the crank-angle sector with
+    the lowest mean velocity; its ratio is that velocity over the mean.
+    """
+    phase = np.asarray(phase_deg, dtype=float)
+    omega = np.gradient(phase) * rate_hz
+    if np.median(omega) < 0:
+        omega = -omega
+    mean = float(omega.mean())
+    if mean <= 0.0:
+        return {"mean_velocity": mean, "smoothness": 0.0, "dead_spot_angle_deg": math.nan,
+                "dead_spot_ratio": math.nan, "profile": np.full(PROFILE_BINS, np.nan)}
+
+    bins = ((phase % 360.0) * PROFILE_BINS / 360.0).astype(int) % PROFILE_BINS
+    counts = np.bincount(bins, minlength=PROFILE_BINS)
+    sums = np.bincount(bins, weights=omega, minlength=PROFILE_BINS)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        profile = np.where(counts > 0, sums / counts, np.nan) / mean
+    dead = int(np.nanargmin(profile))
+    return {
+        "mean_velocity": mean,
+        "smoothness": max(0.0, 1.0 - float(omega.std()) / mean),
+        "dead_spot_angle_deg": (dead + 0.5) * 360.0 / PROFILE_BINS,
+        "dead_spot_ratio": float(profile[dead]),
+        "profile": profile,
+    }
+
+
+def analyze_angles(t, angle_deg, rate_hz=None, window_s=4.0, hop_s=0.5):
+    """Cadence and stroke quality of a whole recording of crank angles.
+
+    Irregular samples are resampled to `rate_hz` (default: the recording's
+    mean rate) first. Returns a dict with per-frame cadence, the median
+    cadence in rpm and the stroke_metrics() fields.
+    """
+    t = np.asarray(t, dtype=float)
+    if rate_hz is None:
+        rate_hz = (len(t) - 1) / (t[-1] - t[0])
+    grid, phase = resample_uniform(t, angle_deg, rate_hz)
+    centers, cadence_hz = cadence_frames(phase, rate_hz, window_s, hop_s)
+
+    result = stroke_metrics(phase, rate_hz)
+    result["frame_t"] = grid[centers] if len(centers) else np.empty(0)
+    result["frame_cadence_hz"] = cadence_hz
+    result["cadence_rpm"] = float(np.median(np.abs(cadence_hz)) * 60.0) if len(cadence_hz) else math.nan
+    return result
+
+
+# ================= ONLINE (sliding DFT) =================
+
+class SlidingCadence:
+    """Cadence from a stream of crank angles with an incremental sliding DFT.
+
+    Samples are assumed to arrive at `rate_hz`. Only the bins of the cadence
+    band (plus one neighbour each side for the Hann window, applied in the
+    frequency domain) are tracked; each update is X = W * (X - old + new) for
+    all bins at once, and extend() folds a whole chunk in with one
+    matrix-vector product. The bins are recomputed exactly once per window
+    so rounding errors cannot accumulate.
+    """
+
+    def __init__(self, rate_hz=90.0, window_s=4.0):
+        self.rate_hz = rate_hz
+        self.n = n = int(round(window_s * rate_hz))
+        kmax = int(math.ceil(MAX_CADENCE_HZ * n / rate_hz)) + 1
+        self.k = np.arange(-kmax, kmax + 1)
+        freqs = self.k * rate_hz / n
+        self._band = (np.abs(freqs) >= MIN_CADENCE_HZ) & (np.abs(freqs) <= MAX_CADENCE_HZ)
+        self._band[[0, -1]] = False
+        self._step = np.exp(2j * np.pi * self.k / n)
+        self._basis = np.exp(-2j * np.pi * np.outer(self.k, np.arange(n)) / n)
+
+        self._buf = np.zeros(n, dtype=complex)
+        self._head = 0
+        self.count = 0
+        self._since_rebuild = 0
+        self.X = np.zeros(len(self.k), dtype=complex)
+
+    def update(self, angle_deg):
+        self.extend((angle_deg,))
+
+    def extend(self, angles_deg):
+        x = np.exp(1j * np.radians(np.asarray(angles_deg, dtype=float)))
+        for start in range(0, len(x), self.n):
+            self._extend_chunk(x[start:start + self.n])
+
+    def _extend_chunk(self, x):
+        m = len(x)
+        idx = (self._head + np.arange(m)) % self.n
+        delta = x - self._buf[idx]
+        self._buf[idx] = x
+        self._head = (self._head + m) % self.n
+        self.count += m
+
+        # X_m = W^m X_0 + sum_j W^(m - j) (new_j - old_j)
+        powers = np.exp(2j * np.pi * np.outer(self.k, m - np.arange(m)) / self.n)
+        self.X = self.X * self._step ** m + powers @ delta
+
+        self._since_rebuild += m
+        if self._since_rebuild >= self.n:
+            self._rebuild()
+
+    def _rebuild(self):
+        # oldest sample first, as the recurrence defines X
+        ordered = np.roll(self._buf, -self._head)
+        self.X = self._basis @ ordered
+        self._since_rebuild = 0
+
+    @property
+    def ready(self):
+        return self.count >= self.n
+
+    def cadence_hz(self):
+        """Signed cadence in Hz over the last window, None until the window is full."""
+        if not self.ready:
+            return None
+        X = self.X
+        hann = np.abs(0.5 * X[1:-1] - 0.25 * (X[:-2] + X[2:]))
+        hann[~self._band[1:-1]] = 0.0
+        i = int(np.argmax(hann))
+        left = hann[i - 1] if i > 0 else 0.0
+        right = hann[i + 1] if i + 1 < len(hann) else 0.0
+        offset = float(_peak_offset(left, hann[i], right))
+        return (self.k[i + 1] + offset) * self.rate_hz / self.n
+
+    def cadence_rpm(self):
+        hz = self.cadence_hz()
+        return None if hz is None else abs(hz) * 60.0
+
+
+def _check(rate_hz=90.0, seconds=120.0):
+    import time
+
+    from tracker_source.synthetic_tracker import SyntheticPedalTrackerSource
+
+    def cadence(t):
+        # 60..90 rpm, slowly varying
+        return 1.25 + 0.25 * np.sin(2.0 * np.pi * t / 40.0)
+
+    src = SyntheticPedalTrackerSource(rate_hz=rate_hz, cadence=cadence, noise_std=0.002)
+    data = src.generate(int(seconds * rate_hz))
+    t, angle = data["t"], data["angle_deg"]
+
+    start = time.perf_counter()
+    offline = analyze_angles(t, angle, rate_hz)
+    offline_ms = (time.perf_counter() - start) * 1000.0
+    truth = cadence(offline["frame_t"])
+    err = np.abs(np.abs(offline["frame_cadence_hz"]) - truth) * 60.0
+    print(
+        f"offline: {len(t)} samples in {offline_ms:.1f} ms, {len(truth)} frames, "
+        f"cadence err mean {err.mean():.2f} rpm max {err.max():.2f} rpm, smoothness {offline['smoothness']:.3f}"
+    )
+
+    online = SlidingCadence(rate_hz=rate_hz)
+    start = time.perf_counter()
+    errs = []
+    chunk = int(rate_hz / 10)
+    for i in range(0, len(angle), chunk):
+        online.extend(angle[i:i + chunk])
+        if online.ready:
+            # the window is centered window_s / 2 in the past
+            center_t = t[min(i + chunk, len(t)) - 1] - online.n / rate_hz / 2.0
+            errs.append(abs(online.cadence_rpm() - float(cadence(center_t)) * 60.0))
+    online_ms = (time.perf_counter() - start) * 1000.0
+    print(
+        f"online (10 Hz chunks): {online_ms / (len(angle) / rate_hz):.2f} ms per second of data, "
+        f"cadence err mean {np.mean(errs):.2f} rpm max {np.max(errs):.2f} rpm"
+    )
+    assert np.max(errs) < 3.0 and err.max() < 3.0
+
+
+if __name__ == "__main__":
+    # run from SphericalCoordinate/: python -m utils.cadence
+    _check()
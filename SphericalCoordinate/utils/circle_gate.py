@@ -0,0 +1,96 @@
+import math
+
+GATE_HOLD = "hold"
+GATE_CLAMP = "clamp"
+GATE_DROP = "drop"
+GATE_POLICIES = (GATE_HOLD, GATE_CLAMP, GATE_DROP)
+
+
+class CircleGate:
+    """Rejects positions that are not on the fitted crank circle.
+
+    A sample passes when its distance to the circle's plane is within
+    `plane_tol` and its distance from the center, measured in the plane,
+    is within `radial_tol` of the radius (both in meters). The basis is
+    cached as plain floats so a check is a few multiplications.
+
+    Failing samples are handled by `policy`:
+      hold  - apply() returns None; the caller keeps the last good phase
+      clamp - samples within `clamp_scale` x the tolerances are projected
+              onto the circle, anything further out is held
+      drop  - apply() returns None; the caller sends nothing
+    """
+
+    def __init__(self, center, normal, radius, plane_tol=0.03, radial_tol=0.03,
+                 policy=GATE_HOLD, clamp_scale=3.0):
+        if policy not in GATE_POLICIES:
+            raise ValueError(f"unknown gate policy {policy!r}, expected one of {GATE_POLICIES}")
+        self.cx, self.cy, self.cz = (float(v) for v in center)
+        nx, ny, nz = (float(v) for v in normal)
+        norm = math.sqrt(nx * nx + ny * ny + nz * nz)
+        self.nx, self.ny, self.nz = nx / norm, ny / norm, nz / norm
+        self.radius = float(radius)
+        self.plane_tol = plane_tol
+        self.radial_tol = radial_tol
+        self.policy = policy
+        self.clamp_scale = clamp_scale
+
+        self.passed = 0
+        self.rejected_plane = 0
+        self.rejected_radial = 0
+        self.clamped = 0
+
+    @property
+    def rejected(self):
+        return self.rejected_plane + self.rejected_radial
+
+    def errors(self, pos):
+        """(signed distance to the plane, radial error) of `pos`, and the in-plane offset."""
+        dx = pos[0] - self.cx
+        dy = pos[1] - self.cy
+        dz = pos[2] - self.cz
+        h = dx * self.nx + dy * self.ny + dz * self.nz
+        qx = dx - h * self.nx
+        qy = dy - h * self.ny
+        qz = dz - h * self.nz
+        rho = math.sqrt(qx * qx + qy * qy + qz * qz)
+        return h, rho - self.radius, (qx, qy, qz, rho)
+
+    def apply(self, pos):
+        """`pos` if it is on the circle, the clamped position, or None."""
+        h, radial, (qx, qy, qz, rho) = self.errors(pos)
+        plane_ok = abs(h) <= self.plane_tol
+        radial_ok = abs(radial) <= self.radial_tol
+        if plane_ok and radial_ok:
+            self.passed += 1
+            return pos
+
+        if not plane_ok:
+            self.rejected_plane += 1
+        else:
+            self.rejected_radial += 1
+
+        if (
+            self.policy == GATE_CLAMP
+            and abs(h) <= self.plane_tol * self.clamp_scale
+            and abs(radial) <= self.radial_tol * self.clamp_scale
+            and rho > 0.0
+        ):
+            self.clamped += 1
+            s = self.radius / rho
+            return (self.cx + qx * s, self.cy + qy * s, self.cz + qz * s)
+        return None
+
+    def reset_stats(self):
+        self.passed = 0
+        self.rejected_plane = 0
+        self.rejected_radial = 0
+        self.clamped = 0
+
+    def stats(self):
+        return {
+            "passed": self.passed,
+            "rejected_plane": self.rejected_plane,
+            "rejected_radial": self.rejected_radial,
+            "clamped": self.clamped,
+        }
@@ -0,0 +1,84 @@
+import math
+
+TDC = "tdc"
+BDC = "bdc"
+
+
+class DeadCenterDetector:
+    """Top/bottom-dead-center crossings of the crank angle.
+
+    Angle 0 (the reference line) is top dead center and 180 is bottom dead
+    center. Angles are unwrapped into a continuous phase; an event fires
+    when the phase reaches the next dead center in either direction, and
+    the one just passed cannot fire again until the crank has moved on to a
+    neighbouring one, so jitter around TDC gives a single event.
+
+    Crossing times are interpolated between the two samples around the
+    crossing, on the same timeline as the samples' `t`. A sample with the
+    previous `t` is a stale repeat and is skipped; an earlier `t` means the
+    source restarted (a looping replay) and tracking re-seeds from it.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.revolutions = 0
+        self.restart()
+
+    def restart(self):
+        """Re-seed from the next sample, keeping the revolution count."""
+        self._phase = None
+        self._angle = 0.0
+        self._t = None
+        self._targets = None
+        self._last_cross = {TDC: None, BDC: None}
+
+    def update(self, angle_deg, t):
+        """Feed one sample; returns a (possibly empty) list of event dicts."""
+        if t is None or t == self._t:
+            return []
+        if self._t is not None and t < self._t:
+            self.restart()
+
+        if self._phase is None:
+            self._phase = angle_deg
+            self._angle = angle_deg
+            self._t = t
+            # between two dead centers: either neighbour can fire first
+            lower = math.floor(angle_deg / 180.0) * 180.0
+            self._targets = (lower, lower + 180.0) if angle_deg != lower else (lower - 180.0, lower + 180.0)
+            return []
+
+        prev_phase, prev_t = self._phase, self._t
+        phase = prev_phase + (angle_deg - self._angle + 180.0) % 360.0 - 180.0
+        self._phase, self._angle, self._t = phase, angle_deg, t
+
+        events = []
+        while True:
+            low, high = self._targets
+            if phase >= high:
+                boundary, direction = high, 1
+            elif phase <= low:
+                boundary, direction = low, -1
+            else:
+                break
+            frac = (boundary - prev_phase) / (phase - prev_phase)
+            t_cross = prev_t + frac * (t - prev_t)
+            events.append(self._event(boundary, direction, t_cross))
+            self._targets = (boundary - 180.0, boundary + 180.0)
+        return events
+
+    def _event(self, boundary, direction, t_cross):
+        kind = TDC if round(boundary / 180.0) % 2 == 0 else BDC
+        if kind == TDC:
+            self.revolutions += direction
+        prev = self._last_cross[kind]
+        self._last_cross[kind] = t_cross
+        return {
+            "type": kind,
+            "t": t_cross,
+            "dir": direction,
+            "rev": self.revolutions,
+            "period_s": t_cross - prev if prev is not None else None,
+        }
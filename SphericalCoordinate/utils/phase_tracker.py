@@ -0,0 +1,180 @@
+import math
+import time
+
+
+class AlphaBetaPhaseTracker:
+    """Crank phase and velocity at any time from irregular angle samples.
+
+    An alpha-beta filter runs on the unwrapped phase: each sample corrects
+    the predicted phase by `alpha` of the residual and the velocity by
+    `beta` of the residual per second. Between samples the phase is
+    extrapolated with the velocity, for at most `max_extrapolate_s`.
+
+    Sample times may be on any timeline (source capture times); `update`
+    also takes the local receive time and keeps the smallest
+    local-minus-sample offset seen, so `predict(now)` works in local time and
+    a sample that arrives late does not pull the output backwards. The
+    offset is allowed to creep up by `offset_relax` seconds per second so
+    clock drift between the two timelines is followed.
+
+    Corrections are blended into the output over `smooth_s` seconds instead
+    of appearing as a step.
+
+    A sample up to `reorder_tol_s` older than the last one is a reordering
+    and is dropped (counted in `late`); a bigger backward jump means the
+    source restarted (a looping or seeking replay) and re-seeds the tracker.
+    """
+
+    def __init__(self, alpha=0.5, beta=0.1, max_extrapolate_s=0.25, max_gap_s=0.5,
+                 smooth_s=0.05, offset_relax=1e-3, reorder_tol_s=0.1):
+        self.alpha = alpha
+        self.beta = beta
+        self.max_extrapolate_s = max_extrapolate_s
+        self.max_gap_s = max_gap_s
+        self.smooth_s = smooth_s
+        self.offset_relax = offset_relax
+        self.reorder_tol_s = reorder_tol_s
+        self.reset()
+
+    def reset(self):
+        self.phase = 0.0
+        self.velocity = 0.0
+        self.t = None
+        self.updates = 0
+        self.late = 0
+        self.restarts = 0
+        self._seed_velocity = 0.0
+        self._offset = None
+        self._offset_now = 0.0
+        self._blend = 0.0
+        self._blend_t = 0.0
+
+    def restart(self):
+        """Re-seed the phase from the next sample but keep the velocity
+        (the angle reference changed, the crank speed did not)."""
+        velocity, late, restarts = self.velocity, self.late, self.restarts
+        self.reset()
+        self.late, self.restarts = late, restarts
+        self.velocity = self._seed_velocity = velocity
+
+    @property
+    def ready(self):
+        return self.t is not None
+
+    def update(self, angle_deg, t, now):
+        """Feed one sample captured at `t` (sample timeline), received at `now` (local)."""
+        if t is None:
+            t = now
+
+        if self.t is not None:
+            dt = t - self.t
+            if dt < -self.reorder_tol_s:
+                # the sample timeline restarted: start over from this sample
+                late, restarts = self.late, self.restarts
+                self.reset()
+                self.late, self.restarts = late, restarts + 1
+            elif dt <= 0.0:
+                # stale repeat or out-of-order sample: already superseded
+                if dt < 0.0:
+                    self.late += 1
+                return
+            elif dt > self.max_gap_s:
+                self.reset()
+
+        before = self._raw_phase(now) if self.t is not None else 0.0
+
+        offset = now - t
+        if self._offset is None:
+            self._offset = offset
+        else:
+            relaxed = self._offset + self.offset_relax * (now - self._offset_now)
+            self._offset = min(relaxed, offset)
+        self._offset_now = now
+
+        if self.t is None:
+            self.phase = angle_deg
+            self.velocity = self._seed_velocity
+            self.t = t
+            self.updates = 1
+            return
+
+        dt = t - self.t
+        predicted = self.phase + self.velocity * dt
+        residual = (angle_deg - predicted + 180.0) % 360.0 - 180.0
+        self.phase = predicted + self.alpha * residual
+        # the first interval has no velocity yet: take it straight from the residual
+        gain = 1.0 if self.updates == 1 and self._seed_velocity == 0.0 else self.beta
+        self.velocity += gain * residual / dt
+        self.t = t
+        self.updates += 1
+
+        # keep the output continuous and blend the correction in
+        if self.smooth_s > 0.0:
+            self._blend = self._blend_at(now) + before - self._raw_phase(now)
+            self._blend_t = now
+
+    def _raw_phase(self, now):
+        dt = min(now - self._offset - self.t, self.max_extrapolate_s)
+        return self.phase + self.velocity * max(dt, 0.0)
+
+    def _blend_at(self, now):
+        if self._blend == 0.0:
+            return 0.0
+        return self._blend * math.exp(-(now - self._blend_t) / self.smooth_s)
+
+    def predict(self, now):
+        """(angle_deg in [0, 360), velocity deg/s) at local time `now`."""
+        if self.t is None:
+            return None, 0.0
+        phase = self._raw_phase(now) + self._blend_at(now)
+        return phase % 360.0, self.velocity
+
+
+def _check(poll_hz=15.0, output_hz=250.0, seconds=60.0, jitter_s=0.01, cadence=1.2):
+    import random
+
+    rng = random.Random(0)
+    tracker = AlphaBetaPhaseTracker()
+    true_v = 360.0 * cadence
+
+    # samples captured every 1/poll_hz, delivered with random latency
+    next_sample = 0.0
+    next_recv = rng.uniform(0.0, jitter_s)
+    n_out = 0
+    worst = 0.0
+    steps = []
+    last_out = None
+    cost = 0.0
+    t = 0.0
+    while t < seconds:
+        t += 1.0 / output_hz
+        while next_recv <= t:
+            angle = (true_v * next_sample + rng.gauss(0.0, 0.3)) % 360.0
+            tracker.update(angle, next_sample, next_recv)
+            next_sample += 1.0 / poll_hz
+            next_recv = next_sample + rng.uniform(0.0, jitter_s)
+
+        start = time.perf_counter()
+        angle, velocity = tracker.predict(t)
+        cost += time.perf_counter() - start
+        n_out += 1
+
+        if t > 2.0:
+            err = (angle - (true_v * t) % 360.0 + 180.0) % 360.0 - 180.0
+            worst = max(worst, abs(err))
+            if last_out is not None:
+                steps.append((angle - last_out + 180.0) % 360.0 - 180.0)
+        last_out = angle
+
+    mean_step = sum(steps) / len(steps)
+    step_dev = max(abs(s - mean_step) for s in steps)
+    print(
+        f"{poll_hz:.0f} Hz in -> {output_hz:.0f} Hz out: max angle err {worst:.2f} deg, "
+        f"step {mean_step:.3f} +- {step_dev:.3f} deg, predict {cost / n_out * 1e6:.2f} us/output"
+    )
+    assert worst < 10.0 and step_dev < mean_step
+
+
+if __name__ == "__main__":
+    # run from SphericalCoordinate/: python -m utils.phase_tracker
+    _check()
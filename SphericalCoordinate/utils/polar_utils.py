@@ -120,6 +120,96 @@ def best_fit_3d_circle(points):
     return center.tolist(), normal.tolist(), radius
 
 
+def pad_point_sets(point_sets):
+    """Ragged list of K point sets -> (K, N, 3) array and (K, N) validity mask."""
+    arrays = [np.asarray(pts, dtype=float).reshape(-1, 3) for pts in point_sets]
+    n = max((len(a) for a in arrays), default=0)
+    padded = np.zeros((len(arrays), n, 3))
+    mask = np.zeros((len(arrays), n), dtype=bool)
+    for k, a in enumerate(arrays):
+        padded[k, :len(a)] = a
+        mask[k, :len(a)] = True
+    return padded, mask
+
+
+def fit_circles_batched(points, mask=None):
+    """Fit K circles at once from a (K, N, 3) array (mask (K, N) marks real points).
+
+    Every step is one stacked NumPy call over all K sets: masked means,
+    (K, 3, 3) scatter matrices by batched matmul, a batched eigh for the
+    plane normals, and a batched 3x3 solve for the in-plane (Kasa) center.
+    The fixed cost of those calls is paid once per batch, so the per-set
+    cost falls as K grows; a batch still costs more than a single fit.
+
+    Returns centers (K, 3), normals (K, 3), radii (K,) and valid (K,);
+    sets with fewer than 3 points or no well-defined circle are not valid
+    and their rows are NaN.
+    """
+    pts = np.asarray(points, dtype=float)
+    k, n = pts.shape[:2]
+    if mask is None:
+        mask = np.ones((k, n), dtype=bool)
+    w = mask.astype(float)
+    count = w.sum(axis=1)
+
+    mean = (w[:, None, :] @ pts)[:, 0, :] / np.maximum(count, 1.0)[:, None]
+    d = (pts - mean[:, None, :]) * w[:, :, None]
+    scatter = d.transpose(0, 2, 1) @ d
+    # eigenvalues ascending: smallest spread is the plane normal
+    _, vecs = np.linalg.eigh(scatter)
+    normals = vecs[:, :, 0]
+    u = vecs[:, :, 2]
+    v = vecs[:, :, 1]
+
+    # Kasa fit in the plane: x^2 + y^2 = 2ax + 2by + c
+    xy = d @ np.stack((u, v), axis=2)
+    x = xy[:, :, 0]
+    y = xy[:, :, 1]
+    z = np.stack((2.0 * x, 2.0 * y, w), axis=2)
+    # padded rows of z are all zero, so no extra weighting is needed
+    zt = z.transpose(0, 2, 1)
+    lhs = zt @ z
+    rhs = zt @ (x * x + y * y)[:, :, None]
+
+    # keep degenerate sets (too few or collinear points) out of the solve
+    scale = np.maximum(np.abs(lhs).max(axis=(1, 2)), 1e-300)
+    valid = (count >= 3) & (np.abs(np.linalg.det(lhs)) > 1e-12 * scale ** 3)
+    lhs[~valid] = np.eye(3)
+    rhs[~valid] = 0.0
+    sol = np.linalg.solve(lhs, rhs)[:, :, 0]
+
+    centers = mean + sol[:, 0:1] * u + sol[:, 1:2] * v
+    dist = np.linalg.norm(pts - centers[:, None, :], axis=2)
+    radii = (dist * w).sum(axis=1) / np.maximum(count, 1.0)
+
+    centers[~valid] = np.nan
+    normals = np.where(valid[:, None], normals, np.nan)
+    radii[~valid] = np.nan
+    return centers, normals, radii, valid
+
+
+def best_fit_3d_circles(point_sets):
+    """Fit many point sets with fit_circles_batched.
+
+    This is a separate fitter, not a batched best_fit_3d_circle: that one
+    centers on the mean of triplet circumcenters and averages distances to
+    it, this one uses a least-squares (Kasa) center in the best-fit plane.
+    They agree on evenly sampled full circles; on partial arcs this one is
+    much closer to the true center.
+
+    Returns a list of (center, normal, radius) tuples, None for sets that
+    can't be fitted.
+    """
+    if not point_sets:
+        return []
+    padded, mask = pad_point_sets(point_sets)
+    centers, normals, radii, valid = fit_circles_batched(padded, mask)
+    return [
+        (centers[i].tolist(), normals[i].tolist(), float(radii[i])) if valid[i] else None
+        for i in range(len(point_sets))
+    ]
+
+
 def line_origin_to_highest_y(points, origin):
     if not points:
         return None
@@ -203,3 +293,65 @@ def visualize_points(points, center, window_size=(640, 640)):
         clock.tick(60)
 
     pygame.quit()
+
+
+def _bench_batched(k=64, n=300, repeat=5, seed=0):
+    import time
+
+    rng = np.random.default_rng(seed)
+    sets = []
+    truth = []
+    for _ in range(k):
+        normal = rng.normal(size=3)
+        normal /= np.linalg.norm(normal)
+        a = rng.normal(size=3)
+        u = np.cross(normal, a)
+        u /= np.linalg.norm(u)
+        v = np.cross(normal, u)
+        center = rng.uniform(-1.0, 1.0, 3)
+        radius = rng.uniform(0.1, 0.3)
+        # ragged sizes, partial arcs
+        m = int(rng.integers(n // 2, n + 1))
+        t = rng.uniform(0.0, rng.uniform(np.pi, 2.0 * np.pi), m)
+        pts = center + radius * (np.cos(t)[:, None] * u + np.sin(t)[:, None] * v)
+        pts += rng.normal(0.0, 0.002, pts.shape)
+        sets.append(pts.tolist())
+        truth.append((center, radius))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        single = [best_fit_3d_circle(p) for p in sets]
+    single_s = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        batched = best_fit_3d_circles(sets)
+    batched_s = (time.perf_counter() - start) / repeat
+
+    padded, mask = pad_point_sets(sets)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fit_circles_batched(padded, mask)
+    padded_s = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fit_circles_batched(padded[:1], mask[:1])
+    one_s = (time.perf_counter() - start) / repeat
+
+    def center_err(fits):
+        return max(np.linalg.norm(np.subtract(f[0], c)) for f, (c, _) in zip(fits, truth)) * 1000.0
+
+    print(
+        f"{k} sets x ~{n} pts: best_fit_3d_circle loop {single_s * 1000:.1f} ms, batched from lists {batched_s * 1000:.1f} ms, "
+        f"batched pre-padded {padded_s * 1000:.1f} ms ({padded_s / k * 1000:.3f} ms/set; a batch of one {one_s * 1000:.2f} ms)"
+    )
+    # different fitters, see best_fit_3d_circles
+    print(
+        f"max center err on partial arcs: best_fit_3d_circle {center_err(single):.1f} mm, Kasa batched {center_err(batched):.1f} mm"
+    )
+
+
+if __name__ == "__main__":
+    # run from SphericalCoordinate/: python -m utils.polar_utils
+    _bench_batched()
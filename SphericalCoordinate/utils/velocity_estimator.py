@@ -0,0 +1,150 @@
+import math
+
+
+class PhaseVelocityEstimator:
+    """Angular velocity (deg/s) from timestamped angles.
+
+    Angles are unwrapped into a continuous phase and the velocity is the
+    least-squares slope of phase over time for the last `window` samples.
+    Running sums make each update O(1); the sums are kept relative to an
+    origin that is moved to the newest sample every `window` updates, so
+    they do not lose precision as time and phase grow.
+
+    A sample with the same timestamp as the previous one is a stale repeat
+    and leaves the estimate unchanged. A timestamp going backwards, or a gap
+    longer than `max_gap_s`, restarts the window.
+    """
+
+    def __init__(self, window=8, max_gap_s=0.5):
+        if window < 2:
+            raise ValueError("window must be at least 2 samples")
+        self.window = window
+        self.max_gap_s = max_gap_s
+        self._ts = [0.0] * window
+        self._phase = [0.0] * window
+        self.reset()
+
+    def reset(self):
+        self.velocity = 0.0
+        self._count = 0
+        self._head = 0
+        self._since_rebase = 0
+        self._t0 = self._p0 = 0.0
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+        self._last_t = None
+        self._last_angle = 0.0
+        self._last_phase = 0.0
+        self._hold = False
+
+    def restart(self):
+        """New window, but keep reporting the current velocity until it is full."""
+        velocity = self.velocity
+        self.reset()
+        self.velocity = velocity
+        self._hold = True
+
+    def update(self, angle_deg, t):
+        """Add one sample; returns the current velocity estimate."""
+        if t is None:
+            return self.velocity
+
+        if self._last_t is not None:
+            dt = t - self._last_t
+            if dt == 0.0:
+                return self.velocity
+            if dt < 0.0 or dt > self.max_gap_s:
+                self.reset()
+
+        if self._last_t is None:
+            phase = angle_deg
+            self._t0, self._p0 = t, phase
+        else:
+            d = (angle_deg - self._last_angle + 180.0) % 360.0 - 180.0
+            phase = self._last_phase + d
+        self._last_t = t
+        self._last_angle = angle_deg
+        self._last_phase = phase
+
+        x = t - self._t0
+        y = phase - self._p0
+        if self._count == self.window:
+            ox = self._ts[self._head]
+            oy = self._phase[self._head]
+            self._sx -= ox
+            self._sy -= oy
+            self._sxx -= ox * ox
+            self._sxy -= ox * oy
+        else:
+            self._count += 1
+        self._ts[self._head] = x
+        self._phase[self._head] = y
+        self._sx += x
+        self._sy += y
+        self._sxx += x * x
+        self._sxy += x * y
+        self._head = (self._head + 1) % self.window
+
+        self._since_rebase += 1
+        if self._since_rebase >= self.window:
+            self._rebase(t, phase)
+
+        n = self._count
+        if self._hold:
+            if n < self.window:
+                return self.velocity
+            self._hold = False
+        denom = n * self._sxx - self._sx * self._sx
+        if n >= 2 and denom > 0.0:
+            self.velocity = (n * self._sxy - self._sx * self._sy) / denom
+        return self.velocity
+
+    def _rebase(self, t, phase):
+        # shift stored samples to the new origin and rebuild the sums (O(window))
+        dx = self._t0 - t
+        dy = self._p0 - phase
+        self._t0, self._p0 = t, phase
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+        for i in range(self._count):
+            x = self._ts[i] + dx
+            y = self._phase[i] + dy
+            self._ts[i] = x
+            self._phase[i] = y
+            self._sx += x
+            self._sy += y
+            self._sxx += x * x
+            self._sxy += x * y
+        self._since_rebase = 0
+
+    @property
+    def lag_s(self):
+        """Age of the window's mean time, the effective delay of the estimate."""
+        if self._count < 2:
+            return 0.0
+        return (self._last_t - self._t0) - self._sx / self._count
+
+
+def _check():
+    import random
+
+    rng = random.Random(0)
+    est = PhaseVelocityEstimator(window=8)
+    true_v = 400.0
+    t = 1.7e9
+    angle = 0.0
+    worst = 0.0
+    for i in range(200000):
+        t += 1.0 / 90.0
+        angle = (angle + true_v / 90.0) % 360.0
+        v = est.update(angle + rng.gauss(0.0, 0.05), t)
+        # every third sample is repeated, as a stale tracker read would be
+        if i % 3 == 0:
+            v = est.update(angle, t)
+        if i > 10:
+            worst = max(worst, abs(v - true_v))
+    print(f"constant {true_v} deg/s, 200k samples at epoch-sized t: max err {worst:.2f} deg/s, lag {est.lag_s * 1000:.1f} ms")
+    assert worst < 15.0 and math.isfinite(est.velocity)
+
+
+if __name__ == "__main__":
+    # run from SphericalCoordinate/: python -m utils.velocity_estimator
+    _check()